@@ -0,0 +1,27 @@
+"""Store the latest maturity summary on users
+
+Revision ID: a6d1f8e3c274
+Revises: f4c7a9d2b581
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = 'a6d1f8e3c274'
+down_revision: Union[str, Sequence[str], None] = 'f4c7a9d2b581'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by session submit from now on; existing users are populated by
+    # `python -m scripts.backfill_maturity_summary`.
+    op.add_column('users', sa.Column('maturity_summary', postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'maturity_summary')
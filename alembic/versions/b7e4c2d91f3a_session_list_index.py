@@ -0,0 +1,32 @@
+"""Composite index for keyset-paginated session lists
+
+Revision ID: b7e4c2d91f3a
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = 'b7e4c2d91f3a'
+down_revision: Union[str, Sequence[str], None] = 'a1b2c3d4e5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GET /sessions pages through (started_at, id) DESC per user; a backward
+    # scan of this index serves every page. It also covers user_id lookups,
+    # so the single-column index is redundant.
+    op.create_index(
+        'ix_assessment_sessions_user_started',
+        'assessment_sessions',
+        ['user_id', 'started_at', 'id'],
+    )
+    op.drop_index('ix_assessment_sessions_user_id', table_name='assessment_sessions')
+
+
+def downgrade() -> None:
+    op.create_index('ix_assessment_sessions_user_id', 'assessment_sessions', ['user_id'])
+    op.drop_index('ix_assessment_sessions_user_started', table_name='assessment_sessions')
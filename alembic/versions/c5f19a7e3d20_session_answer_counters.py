@@ -0,0 +1,72 @@
+"""Answered / total question counters on assessment_sessions
+
+Revision ID: c5f19a7e3d20
+Revises: b7e4c2d91f3a
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'c5f19a7e3d20'
+down_revision: Union[str, Sequence[str], None] = 'b7e4c2d91f3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tier rules as of this revision, copied so the backfill doesn't change with
+# the application code.
+_TIER_ORDER = {"free": 0, "basic": 1, "premium": 2}
+_TIER_LIMITS = {"free": 2, "basic": 4, "premium": None}
+
+
+def _accessible_question_count(config: dict, tier: str) -> int:
+    user_level = _TIER_ORDER.get(tier, 0)
+    limit = _TIER_LIMITS.get(tier)
+    total = 0
+    for dim in config.get("dimensions", []):
+        eligible = [
+            q for q in dim.get("questions", [])
+            if _TIER_ORDER.get(q.get("tier", "free"), 0) <= user_level
+        ]
+        total += len(eligible if limit is None else eligible[:limit])
+    return total
+
+
+def upgrade() -> None:
+    op.add_column('assessment_sessions', sa.Column('answered_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('assessment_sessions', sa.Column('total_questions', sa.Integer(), nullable=False, server_default='0'))
+
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        """
+        UPDATE assessment_sessions s
+        SET answered_count = r.n
+        FROM (SELECT session_id, count(*) AS n FROM responses GROUP BY session_id) r
+        WHERE r.session_id = s.id
+        """
+    ))
+
+    # Totals follow the tier rules above, once per (assessment, tier).
+    pairs = conn.execute(sa.text(
+        """
+        SELECT a.id, s.tier_at_time::text AS tier, a.config
+        FROM assessments a
+        JOIN (SELECT DISTINCT assessment_id, tier_at_time FROM assessment_sessions) s
+          ON s.assessment_id = a.id
+        """
+    )).all()
+    for assessment_id, tier, config in pairs:
+        conn.execute(
+            sa.text(
+                "UPDATE assessment_sessions SET total_questions = :total "
+                "WHERE assessment_id = :assessment_id AND tier_at_time::text = :tier"
+            ),
+            {"total": _accessible_question_count(config or {}, tier), "assessment_id": assessment_id, "tier": tier},
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('assessment_sessions', 'total_questions')
+    op.drop_column('assessment_sessions', 'answered_count')
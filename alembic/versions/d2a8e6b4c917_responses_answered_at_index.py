@@ -0,0 +1,28 @@
+"""Index responses on (session_id, answered_at) for answer delta sync
+
+Revision ID: d2a8e6b4c917
+Revises: c5f19a7e3d20
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = 'd2a8e6b4c917'
+down_revision: Union[str, Sequence[str], None] = 'c5f19a7e3d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GET /sessions/{id}/answers?since= reads a session's answers newer than
+    # a cursor, in answered_at order. Plain session_id lookups are already
+    # served by uq_responses_session_question, so the old index can go.
+    op.create_index('ix_responses_session_answered_at', 'responses', ['session_id', 'answered_at'])
+    op.drop_index('ix_responses_session_id', table_name='responses')
+
+
+def downgrade() -> None:
+    op.create_index('ix_responses_session_id', 'responses', ['session_id'])
+    op.drop_index('ix_responses_session_answered_at', table_name='responses')
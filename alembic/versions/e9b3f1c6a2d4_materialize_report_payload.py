@@ -0,0 +1,138 @@
+"""Store recommendations, dimension labels, radar data and assessment version on reports
+
+Revision ID: e9b3f1c6a2d4
+Revises: d2a8e6b4c917
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = 'e9b3f1c6a2d4'
+down_revision: Union[str, Sequence[str], None] = 'd2a8e6b4c917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Scoring as of this revision (app/services/scoring.py), copied so the
+# backfill doesn't change with the application code. Only what the payload
+# needs: dimension names, and recommendations for the re-scored tier result.
+_TIER_ORDER = {"free": 0, "basic": 1, "premium": 2}
+_TIER_LIMITS = {"free": 2, "basic": 4, "premium": None}
+_DEFAULT_THRESHOLDS = {
+    "nascent": [0, 30],
+    "developing": [30, 55],
+    "maturing": [55, 75],
+    "leading": [75, 100],
+}
+
+
+def _eligible(questions: list[dict], tier: str) -> list[dict]:
+    user_level = _TIER_ORDER.get(tier, 0)
+    eligible = [q for q in questions if _TIER_ORDER.get(q.get("tier", "free"), 0) <= user_level]
+    limit = _TIER_LIMITS.get(tier)
+    return eligible if limit is None else eligible[:limit]
+
+
+def _score_question(answer_value: float, question: dict) -> float:
+    q_type = question.get("type", "scale")
+    max_score = float(question.get("max_score", 5))
+    if q_type == "scale":
+        return min(max(answer_value / max_score * 100, 0), 100)
+    if q_type == "boolean":
+        return 100.0 if answer_value else 0.0
+    if q_type == "multiple_choice":
+        options = question.get("options", {})
+        scoring_map = options.get("scoring", {}) if isinstance(options, dict) else {}
+        return float(scoring_map.get(str(int(answer_value)), 0.5)) * 100
+    return 50.0 if answer_value else 0.0
+
+
+def _names_and_recommendations(responses: list[dict], config: dict, tier: str) -> tuple[dict, dict]:
+    response_map = {r["question_id"]: float(r["answer_value"]) for r in responses}
+    scores, names, weights = {}, {}, {}
+    for dim in config.get("dimensions", []):
+        dim_id = dim["id"]
+        names[dim_id] = dim["name"]
+        weights[dim_id] = float(dim.get("weight", 1.0))
+        scored = [
+            _score_question(response_map[q["id"]], q)
+            for q in _eligible(dim.get("questions", []), tier)
+            if response_map.get(q["id"]) is not None
+        ]
+        scores[dim_id] = (sum(scored) / len(scored)) if scored else 0.0
+
+    total_weight = sum(weights.get(k, 1.0) for k in scores)
+    overall = sum(scores[k] * weights.get(k, 1.0) for k in scores) / total_weight if total_weight else 0.0
+    tier_result = "nascent"
+    for label, (lo, hi) in config.get("scoring", {}).get("thresholds", _DEFAULT_THRESHOLDS).items():
+        if lo <= overall <= hi:
+            tier_result = label
+            break
+    rec_config = config.get("scoring", {}).get("recommendations", {})
+    return names, {dim_id: rec_config.get(dim_id, {}).get(tier_result, "") for dim_id in scores}
+
+
+def upgrade() -> None:
+    op.add_column('reports', sa.Column('recommendations', postgresql.JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")))
+    op.add_column('reports', sa.Column('dimension_labels', postgresql.JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")))
+    op.add_column('reports', sa.Column('radar_data', postgresql.JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")))
+    op.add_column('reports', sa.Column('assessment_version', sa.Integer(), nullable=False, server_default='1'))
+
+    # Existing reports: re-score once against the current config, exactly as
+    # GET /reports did on every read until now.
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        """
+        SELECT r.id, r.scores, s.tier_at_time::text AS tier, a.config, a.version,
+               coalesce(
+                   json_agg(json_build_object(
+                       'question_id', resp.question_id,
+                       'dimension_id', resp.dimension_id,
+                       'answer_value', resp.answer_value
+                   )) FILTER (WHERE resp.id IS NOT NULL),
+                   '[]'
+               ) AS responses
+        FROM reports r
+        JOIN assessment_sessions s ON s.id = r.session_id
+        JOIN assessments a ON a.id = s.assessment_id
+        LEFT JOIN responses resp ON resp.session_id = s.id
+        GROUP BY r.id, s.id, a.id
+        """
+    )).all()
+    update = sa.text(
+        """
+        UPDATE reports
+        SET recommendations = :recommendations, dimension_labels = :dimension_labels,
+            radar_data = :radar_data, assessment_version = :assessment_version
+        WHERE id = :id
+        """
+    ).bindparams(
+        sa.bindparam('recommendations', type_=postgresql.JSONB()),
+        sa.bindparam('dimension_labels', type_=postgresql.JSONB()),
+        sa.bindparam('radar_data', type_=postgresql.JSONB()),
+    )
+    for row in rows:
+        names, recommendations = _names_and_recommendations(row.responses, row.config or {}, row.tier)
+        conn.execute(update, {
+            'id': row.id,
+            'recommendations': recommendations,
+            'dimension_labels': names,
+            'radar_data': [
+                {'dimension': dim_id, 'score': float(score), 'label': names.get(dim_id, dim_id)}
+                for dim_id, score in (row.scores or {}).items()
+            ],
+            'assessment_version': row.version,
+        })
+
+    for column in ('recommendations', 'dimension_labels', 'radar_data', 'assessment_version'):
+        op.alter_column('reports', column, server_default=None)
+
+
+def downgrade() -> None:
+    op.drop_column('reports', 'assessment_version')
+    op.drop_column('reports', 'radar_data')
+    op.drop_column('reports', 'dimension_labels')
+    op.drop_column('reports', 'recommendations')
@@ -0,0 +1,51 @@
+"""Link each report to the previous report of the same user and assessment
+
+Revision ID: f4c7a9d2b581
+Revises: e9b3f1c6a2d4
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = 'f4c7a9d2b581'
+down_revision: Union[str, Sequence[str], None] = 'e9b3f1c6a2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('reports', sa.Column('previous_report_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('reports', sa.Column('previous_radar_data', postgresql.JSONB(), nullable=True))
+    op.create_foreign_key(
+        'fk_reports_previous_report_id', 'reports', 'reports',
+        ['previous_report_id'], ['id'], ondelete='SET NULL',
+    )
+
+    # Existing reports: the predecessor is the report of the user's previous
+    # completed session of the same assessment, in completion order.
+    op.execute(
+        """
+        UPDATE reports r
+        SET previous_report_id = p.previous_id, previous_radar_data = p.previous_radar
+        FROM (
+            SELECT r.id,
+                   lag(r.id) OVER w AS previous_id,
+                   lag(r.radar_data) OVER w AS previous_radar
+            FROM reports r
+            JOIN assessment_sessions s ON s.id = r.session_id
+            WHERE s.status = 'completed' AND s.completed_at IS NOT NULL
+            WINDOW w AS (PARTITION BY s.user_id, s.assessment_id ORDER BY s.completed_at, s.id)
+        ) p
+        WHERE p.id = r.id AND p.previous_id IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_reports_previous_report_id', 'reports', type_='foreignkey')
+    op.drop_column('reports', 'previous_radar_data')
+    op.drop_column('reports', 'previous_report_id')
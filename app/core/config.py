@@ -11,11 +11,75 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
     DIRECT_URL: str = os.getenv("DIRECT_URL", "")
+    # Connection mode per engine. "pooler": DATABASE_URL through the Supabase
+    # transaction pooler, where prepared statements can't survive between
+    # transactions, so both asyncpg's statement cache and SQLAlchemy's
+    # prepared-statement cache are off. "direct": DIRECT_URL (a real Postgres
+    # session) with both caches at DB_STATEMENT_CACHE_SIZE, saving a
+    # parse/plan per query.
+    DB_CONNECTION_MODE: str = os.getenv("DB_CONNECTION_MODE", "pooler")
+    DB_READ_CONNECTION_MODE: str = os.getenv("DB_READ_CONNECTION_MODE", "pooler")
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    # Connection pool (per engine). Warmup opens DB_POOL_SIZE connections at
+    # startup so the first requests after a deploy don't pay for connects.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_WARMUP: bool = True
+    # Optional read replica for GET endpoints; empty means read from primary.
+    DATABASE_READ_URL: str = os.getenv("DATABASE_READ_URL", "")
+    # After a user writes, their reads stay on the primary this long so they
+    # never see replica lag (e.g. the report right after submit).
+    READ_YOUR_WRITES_SECONDS: int = 10
+
+    # Write-behind for answers: accept into a per-session in-memory buffer and
+    # write in batches on this interval (plus on submit/abandon/shutdown).
+    # In-process only, so leave it off when running several workers without
+    # sticky sessions.
+    ANSWER_WRITE_BEHIND: bool = False
+    ANSWER_FLUSH_INTERVAL_SECONDS: float = 1.0
+
+    # Sessions left in progress with no answers for this long are marked
+    # abandoned by a background sweep (one replica at a time, small batches).
+    SESSION_SWEEP_ENABLED: bool = True
+    SESSION_IDLE_ABANDON_HOURS: float = 168.0
+    SESSION_SWEEP_INTERVAL_SECONDS: float = 3600.0
+    SESSION_SWEEP_BATCH_SIZE: int = 500
 
     # Supabase (service role key — backend only, never exposed to frontend)
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_SERVICE_ROLE_KEY: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
 
+    # Auth — "local" verifies JWTs in-process (JWT secret or the project JWKS)
+    # and only asks Supabase about tokens it has no key for; "remote" always
+    # asks Supabase.
+    AUTH_VERIFY_MODE: str = os.getenv("AUTH_VERIFY_MODE", "local")
+    SUPABASE_JWT_SECRET: str = os.getenv("SUPABASE_JWT_SECRET", "")
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
+    JWT_LEEWAY_SECONDS: int = 10
+    JWKS_REFRESH_SECONDS: int = 600
+    # Remote checks against Supabase (tokens with no local key, revocation)
+    AUTH_INTROSPECTION_CONCURRENCY: int = 20
+    AUTH_INTROSPECTION_TIMEOUT_SECONDS: float = 5.0
+    AUTH_NEGATIVE_CACHE_SECONDS: int = 10
+
+    # In-process cache of authenticated users rows (LRU + TTL)
+    USER_CACHE_MAX_SIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: int = 60
+
+    # In-process cache of serialized GET /reports bodies. Reports waiting for
+    # their PDF are cached only briefly, so a pdf_url set by another replica
+    # shows up within REPORT_CACHE_PENDING_PDF_SECONDS.
+    REPORT_CACHE_MAX_SIZE: int = 2_000
+    REPORT_CACHE_TTL_SECONDS: int = 3600
+    REPORT_CACHE_PENDING_PDF_SECONDS: int = 5
+
+    # GET /metrics (Prometheus) serves pool, auth and answer-buffer internals,
+    # so it is admin-only unless this is on. Only turn it on where /metrics
+    # can't be reached from the internet (e.g. a scraper on a private network).
+    METRICS_PUBLIC: bool = False
+
     # Cloudinary (PDF storage)
     CLOUDINARY_CLOUD_NAME: str = os.getenv("CLOUDINARY_CLOUD_NAME", "")
     CLOUDINARY_API_KEY: str = os.getenv("CLOUDINARY_API_KEY", "")
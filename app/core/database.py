@@ -1,16 +1,81 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+import logging
+import time
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger("redelk.db")
+
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection", ["pool"],
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS", ["pool"],
+)
 
-ASYNC_DATABASE_URL = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection.
+
+    The wait includes opening a new connection when the pool has none idle,
+    which is exactly the cold-start cost warmup removes.
+    """
+
+    def _do_get(self):
+        name = getattr(self, "logging_name", None) or "default"
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.inc(pool=name)
+            raise
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - start, pool=name)
+
+
+def engine_options(url: str, mode: str, direct_url: str = "") -> tuple[str, dict]:
+    """Async URL and connect_args for an engine in "pooler" or "direct" mode."""
+    if mode == "direct":
+        url = direct_url or url
+        connect_args = {
+            # asyncpg's own cache plus SQLAlchemy's adapter-level cache.
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    elif mode == "pooler":
+        # Both caches off: a statement prepared in one pooled transaction may
+        # not exist on the server connection the next one lands on.
+        connect_args = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    else:
+        raise ValueError(f"Unknown DB connection mode {mode!r} (expected 'pooler' or 'direct')")
+    return url.replace("postgresql://", "postgresql+asyncpg://"), connect_args
+
+
+ASYNC_DATABASE_URL, _connect_args = engine_options(
+    settings.DATABASE_URL, settings.DB_CONNECTION_MODE, settings.DIRECT_URL
+)
+
+_pool_options = dict(
+    poolclass=TimedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+)
 
 engine = create_async_engine(
     ASYNC_DATABASE_URL,
     # SQL logging is handled centrally via the `sqlalchemy.engine` logger
     # (see app/core/logging.py), kept at WARNING to avoid per-statement spam.
     echo=False,
-    pool_size=10,
-    max_overflow=20,
-    connect_args={"statement_cache_size": 0},
+    pool_logging_name="primary",
+    connect_args=_connect_args,
+    **_pool_options,
 )
 
 async_session_maker = async_sessionmaker(
@@ -19,6 +84,71 @@ async_session_maker = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Read replica for read-only endpoints. Falls back to the primary engine when
+# no replica is configured, so callers never need to care.
+if settings.DATABASE_READ_URL:
+    _read_url, _read_connect_args = engine_options(
+        settings.DATABASE_READ_URL, settings.DB_READ_CONNECTION_MODE
+    )
+    read_engine = create_async_engine(
+        _read_url,
+        echo=False,
+        pool_logging_name="replica",
+        connect_args=_read_connect_args,
+        **_pool_options,
+    )
+else:
+    read_engine = engine
+
+read_session_maker = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+
+async def warm_pool(eng: AsyncEngine, connections: int) -> int:
+    """Open `connections` connections at once and return them to the pool.
+
+    Failures are logged, never raised — a cold pool is slower, not broken.
+    Returns how many connections were opened.
+    """
+    results = await asyncio.gather(
+        *(eng.connect() for _ in range(connections)), return_exceptions=True
+    )
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    for conn in opened:
+        await conn.close()
+    name = getattr(eng.pool, "logging_name", None) or "default"
+    if len(opened) < connections:
+        failure = next(r for r in results if isinstance(r, BaseException))
+        logger.warning(
+            "%s pool warmup opened %d/%d connections (%s)", name, len(opened), connections, failure
+        )
+    else:
+        logger.info("%s pool warmed: %d connections", name, len(opened))
+    return len(opened)
+
+
+def pool_stats(eng: AsyncEngine) -> dict:
+    pool = eng.pool
+    name = getattr(pool, "logging_name", None) or "default"
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {"pool": name, "class": type(pool).__name__}
+    waits = DB_POOL_WAIT_SECONDS.count(pool=name)
+    wait_sum = DB_POOL_WAIT_SECONDS.sum(pool=name)
+    return {
+        "pool": name,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checkouts": waits,
+        "avg_wait_ms": round(wait_sum / waits * 1000, 3) if waits else None,
+        "timeouts": int(DB_POOL_TIMEOUTS.value(pool=name)),
+    }
+
 
 async def get_db():
     async with async_session_maker() as session:
@@ -26,3 +156,26 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+def dialect_insert(db: AsyncSession, entity):
+    """INSERT construct with ON CONFLICT / RETURNING support for `db`'s dialect.
+
+    Production runs on PostgreSQL; the test suite runs on SQLite, whose insert
+    construct exposes the same `on_conflict_do_*` API.
+    """
+    if db.bind.dialect.name == "sqlite":
+        return sqlite.insert(entity)
+    return postgresql.insert(entity)
+
+
+def _register_pool_gauges(name: str, eng: AsyncEngine) -> None:
+    Gauge(f"db_pool_{name}_checked_out", f"Connections checked out of the {name} pool",
+          lambda: eng.pool.checkedout())
+    Gauge(f"db_pool_{name}_overflow", f"Overflow connections open on the {name} pool",
+          lambda: max(eng.pool.overflow(), 0))
+
+
+_register_pool_gauges("primary", engine)
+if read_engine is not engine:
+    _register_pool_gauges("replica", read_engine)
@@ -42,6 +42,8 @@ def setup_logging(level: str = "INFO") -> None:
     # problems (pool exhaustion, disconnects) without the cached-query noise.
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
     logging.getLogger("sqlalchemy.pool").setLevel(logging.WARNING)
+    # Our pool subclass logs under its own module path rather than sqlalchemy.pool.
+    logging.getLogger("app.core.database.TimedQueuePool").setLevel(logging.WARNING)
 
     # Uvicorn's default access log ("INFO: 1.2.3.4 - GET /x 200") is replaced
     # by our richer access middleware, so quiet the built-in one.
@@ -0,0 +1,126 @@
+"""In-process metrics with Prometheus text exposition.
+
+A deliberately small registry — counters, histograms and callback gauges —
+so hot paths can record timings without pulling in a client library. Values
+are per process; `GET /metrics` (see app/main.py) renders them for scraping.
+"""
+import bisect
+from typing import Callable, Iterable
+
+# Latency buckets in seconds, from sub-millisecond (cache hits, local JWT
+# checks) up to multi-second network calls.
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+_registry: list["_Metric"] = []
+
+
+def _fmt_labels(labelnames: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(k, "")) for k in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def sum(self, **labels) -> float:
+        return self._sums.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for key in sorted(self._counts):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), self._counts[key]):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = _fmt_labels(self.labelnames, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {self._sums[key]:g}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value read from a callback at scrape time (cache sizes, pool state)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Callable[[], float]):
+        super().__init__(name, help)
+        self.fn = fn
+
+    def render(self) -> list[str]:
+        return super().render() + [f"{self.name} {float(self.fn()):g}"]
+
+
+def render_prometheus() -> str:
+    lines: list[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
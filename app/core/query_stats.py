@@ -0,0 +1,104 @@
+"""Per-request SQL statement accounting.
+
+Engine-level event hooks count every statement and its DB time into the
+trackers active in the current context. The access-log middleware opens one
+tracker per request; tests can open their own around a call (trackers nest,
+and each sees every statement run inside it).
+
+Endpoints declare how many statements they're allowed with
+`@statement_budget(n)`. In development an endpoint that goes over budget, or
+that runs the same statement repeatedly (the N+1 shape), logs a warning.
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# The same SQL text this many times in one request is reported as a likely N+1.
+N_PLUS_ONE_THRESHOLD = 3
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0  # seconds
+    statements: Counter = field(default_factory=Counter)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int]]:
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+_active: ContextVar[tuple[QueryStats, ...]] = ContextVar("query_stats", default=())
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+def untracked_context() -> Context:
+    """Copy of the current context with no trackers, for background tasks that
+    outlive the request (their statements aren't the request's)."""
+    ctx = copy_context()
+    ctx.run(_active.set, ())
+    return ctx
+
+
+def statement_budget(limit: int) -> Callable:
+    """Declare the max number of SQL statements an endpoint may run per request.
+
+    Counted with a warm identity cache — a user's first request adds one
+    SELECT for the users row on top of this.
+    """
+    def decorator(fn: Callable) -> Callable:
+        fn.__statement_budget__ = limit
+        return fn
+    return decorator
+
+
+def budget_for(endpoint: Optional[Callable]) -> Optional[int]:
+    return getattr(endpoint, "__statement_budget__", None)
+
+
+def budget_warnings(endpoint: Optional[Callable], stats: QueryStats) -> list[str]:
+    """Human-readable problems with a request's statements (empty if none)."""
+    warnings = []
+    budget = budget_for(endpoint)
+    if budget is not None and stats.count > budget:
+        warnings.append(f"ran {stats.count} SQL statements, budget is {budget}")
+    for sql, n in stats.repeated():
+        warnings.append(f"possible N+1, same statement ran {n} times: {' '.join(sql.split())[:200]}")
+    return warnings
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get():
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trackers = _active.get()
+    if not trackers:
+        return
+    starts = conn.info.get("query_start")
+    elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+    for stats in trackers:
+        stats.count += 1
+        stats.duration += elapsed
+        stats.statements[statement] += 1
@@ -1,3 +1,3 @@
-from app.core.database import get_db, engine, async_session_maker
+from app.core.database import get_db, engine, async_session_maker, read_engine, read_session_maker
 
-__all__ = ["get_db", "engine", "async_session_maker"]
+__all__ = ["get_db", "engine", "async_session_maker", "read_engine", "read_session_maker"]
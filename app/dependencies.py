@@ -1,26 +1,66 @@
 import logging
+import time
 import uuid
-from functools import lru_cache
+from contextlib import contextmanager
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import inspect, literal_column, true
 from sqlalchemy.exc import IntegrityError
-from supabase import create_client, Client
+from sqlalchemy.orm import make_transient_to_detached
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import async_session_maker, dialect_insert, get_db, read_session_maker
+from app.core.metrics import Counter, Gauge, Histogram
 from app.models.models import User, TierEnum
+from app.services import token_introspection, token_verifier
+from app.services.token_verifier import CannotVerifyLocally, TokenIdentity, TokenRejected
+from app.utils.cache import TTLCache
 
 logger = logging.getLogger("redelk.auth")
 
 _bearer = HTTPBearer()
 
+# Authenticated users rows keyed by id. Entries are detached snapshots, never
+# the instance handed to a route, so route-side edits can't leak into the
+# cache. Every endpoint that writes a users row calls `invalidate_user`;
+# other replicas converge within USER_CACHE_TTL_SECONDS.
+user_cache: TTLCache[User] = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
 
-@lru_cache(maxsize=1)
-def _get_supabase() -> Client:
-    if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_ROLE_KEY:
-        raise RuntimeError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+
+AUTH_PHASE_SECONDS = Histogram(
+    "auth_phase_seconds", "Time spent in each get_current_user phase", ["phase"],
+)
+AUTH_VERIFICATIONS = Counter(
+    "auth_verifications_total", "Token verifications by method and outcome", ["method", "outcome"],
+)
+AUTH_USER_LOOKUPS = Counter(
+    "auth_user_lookups_total", "Authenticated user lookups by source", ["source"],
+)
+AUTH_USER_CREATES = Counter(
+    "auth_user_creates_total", "First-login user creations by outcome", ["outcome"],
+)
+Gauge("auth_identity_cache_size", "Entries in the identity cache", lambda: len(user_cache))
+
+
+def invalidate_user(user_id: uuid.UUID) -> None:
+    user_cache.invalidate(user_id)
+
+
+# Users who wrote within READ_YOUR_WRITES_SECONDS; their reads stay on the
+# primary. This covers follow-up requests served by this process; clients can
+# also force it with an `X-Consistency: primary` header.
+_recent_writers: TTLCache[bool] = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.READ_YOUR_WRITES_SECONDS,
+)
+
+
+def pin_reads_to_primary(user_id: uuid.UUID) -> None:
+    _recent_writers.set(user_id, True)
 
 
 async def get_current_user(
@@ -28,45 +68,143 @@ async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(_bearer),
     db: AsyncSession = Depends(get_db),
 ) -> User:
-    token = credentials.credentials
-    try:
-        response = _get_supabase().auth.get_user(token)
-        sb_user = response.user if response is not None else None
-        if not sb_user:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    except HTTPException:
-        raise
-    except RuntimeError:
-        raise
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+    # Per-phase timings (ms) for the access-log line; set up front so a
+    # rejected token still reports how long verification took.
+    timings: dict[str, float] = {}
+    request.state.auth_timings = timings
 
-    user_id = uuid.UUID(str(sb_user.id))
-    user = await db.get(User, user_id)
-    if not user:
-        try:
-            user = User(
-                id=user_id,
-                email=sb_user.email,
-                tier=TierEnum.free,
-            )
-            db.add(user)
-            await db.commit()
-            await db.refresh(user)
-            logger.info("new user signed up: %s (id=%s)", user.email, user.id)
-        except IntegrityError:
-            # Another concurrent request already inserted this user; roll back
-            # our failed transaction and fetch the row that won the race.
-            await db.rollback()
-            user = await db.get(User, user_id)
-            if not user:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create user")
+    user = await authenticate(credentials.credentials, db, timings)
 
     # Tag the request so the access-log middleware can attribute it to a user.
     request.state.user = user
     return user
 
 
+async def authenticate(token: str, db: AsyncSession, timings: dict[str, float] | None = None) -> User:
+    """Bearer token -> users row: verify, look up (cache first), create on first login.
+
+    Shared by `get_current_user` and endpoints that authenticate outside the
+    HTTP dependency chain (the session WebSocket). Raises HTTPException 401/500/503.
+    """
+    timings = {} if timings is None else timings
+
+    with _phase("verify", timings):
+        identity = await _verify_token(token)
+
+    with _phase("lookup", timings):
+        cached = user_cache.get(identity.user_id)
+        if cached is not None:
+            AUTH_USER_LOOKUPS.inc(source="cache")
+            # Attach a copy to this request's session without a SELECT.
+            user = await db.merge(cached, load=False)
+        else:
+            AUTH_USER_LOOKUPS.inc(source="db")
+            user = await db.get(User, identity.user_id)
+
+    if user is None:
+        with _phase("create", timings):
+            user = await _create_user(identity, db)
+    if cached is None:
+        user_cache.set(user.id, _snapshot(user))
+    return user
+
+
+@contextmanager
+def _phase(name: str, timings: dict[str, float]):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        AUTH_PHASE_SECONDS.observe(elapsed, phase=name)
+        timings[name] = elapsed * 1000
+
+
+async def _create_user(identity: TokenIdentity, db: AsyncSession) -> User:
+    """First login: one INSERT ... ON CONFLICT ... RETURNING.
+
+    If a concurrent request inserted the row first, the no-op DO UPDATE hands
+    back that row instead of failing the transaction. On PostgreSQL `xmax = 0`
+    tells a fresh insert from such a race.
+    """
+    insert = dialect_insert(db, User)
+    inserted = true() if db.bind.dialect.name == "sqlite" else literal_column("xmax = 0")
+    stmt = insert.values(
+        id=identity.user_id,
+        email=identity.email,
+        tier=TierEnum.free,
+        role="user",
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.id],
+        set_={"id": stmt.excluded.id},
+    ).returning(User, inserted)
+    try:
+        user, was_inserted = (
+            await db.execute(stmt, execution_options={"populate_existing": True})
+        ).one()
+        await db.commit()
+    except IntegrityError:
+        # Email already taken by a different id — nothing to return.
+        await db.rollback()
+        AUTH_USER_CREATES.inc(outcome="failed")
+        logger.exception("could not create user %s (id=%s)", identity.email, identity.user_id)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create user")
+
+    if was_inserted:
+        AUTH_USER_CREATES.inc(outcome="inserted")
+        logger.info("new user signed up: %s (id=%s)", user.email, user.id)
+    else:
+        AUTH_USER_CREATES.inc(outcome="race")
+    return user
+
+
+def _snapshot(user: User) -> User:
+    """Detached copy of a loaded User, safe to share across sessions."""
+    copy = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+async def _verify_token(token: str) -> TokenIdentity:
+    """Verify the bearer token locally; ask Supabase only if we have no key for it."""
+    method = "local"
+    try:
+        try:
+            identity = await token_verifier.verify_locally(token)
+        except CannotVerifyLocally:
+            method = "remote"
+            identity = await token_introspection.introspect(token)
+    except TokenRejected:
+        AUTH_VERIFICATIONS.inc(method=method, outcome="rejected")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+    except token_introspection.IntrospectionUnavailable:
+        # Not the client's fault: a 401 would send every user back to login.
+        AUTH_VERIFICATIONS.inc(method=method, outcome="unavailable")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Authentication service unavailable",
+        )
+    AUTH_VERIFICATIONS.inc(method=method, outcome="ok")
+    return identity
+
+
+async def get_read_db(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+):
+    """DB session for read-only endpoints: the replica, unless the caller just wrote."""
+    primary = (
+        request.headers.get("x-consistency") == "primary"
+        or _recent_writers.get(current_user.id) is not None
+    )
+    maker = async_session_maker if primary else read_session_maker
+    async with maker() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 async def get_current_admin(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -1,23 +1,51 @@
 import logging
 import time
 import uuid
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.core.config import settings
+from app.core.database import engine, read_engine, warm_pool
 from app.core.logging import request_id_var, setup_logging
+from app.core.metrics import render_prometheus
+from app.core.query_stats import budget_warnings, track_queries
+from app.dependencies import get_current_admin
 from app.routers import auth, assessments, sessions, reports, admin
+from app.services import token_introspection
+from app.services.answer_buffer import answer_buffer
+from app.services.session_sweeper import session_sweeper
 
 setup_logging("DEBUG" if settings.ENVIRONMENT == "development" else "INFO")
 logger = logging.getLogger("redelk.access")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DB_POOL_WARMUP:
+        engines = [engine] if read_engine is engine else [engine, read_engine]
+        for eng in engines:
+            await warm_pool(eng, settings.DB_POOL_SIZE)
+    answer_buffer.start()
+    session_sweeper.start()
+    yield
+    await session_sweeper.stop()
+    await answer_buffer.stop()
+    await token_introspection.introspector.aclose()
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Red Elk AI Maturity Assessment API",
     version=settings.VERSION,
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 
@@ -27,31 +55,42 @@ async def access_log(request: Request, call_next):
 
     `request.state.user` is populated by `get_current_user` while the route's
     dependencies resolve, so by the time the response is ready we know who made
-    the call (or "anon" for unauthenticated/failed-auth requests).
+    the call (or "anon" for unauthenticated/failed-auth requests). SQL
+    statements run while handling the request are counted too; in development
+    an endpoint over its statement budget, or repeating a query, logs a warning.
     """
     request_id = uuid.uuid4().hex[:8]
     token = request_id_var.set(request_id)
     start = time.perf_counter()
     status_code = 500
     try:
-        response = await call_next(request)
+        with track_queries() as queries:
+            response = await call_next(request)
         status_code = response.status_code
         return response
     finally:
         duration_ms = (time.perf_counter() - start) * 1000
         user = getattr(request.state, "user", None)
         actor = f"{user.email}<{user.tier.value}>" if user is not None else "anon"
+        auth_timings = getattr(request.state, "auth_timings", None)
+        auth = ",".join(f"{k}:{v:.1f}" for k, v in auth_timings.items()) if auth_timings else "-"
         # Health/root checks are noise — drop them to DEBUG.
-        level = logging.DEBUG if request.url.path in ("/health", "/") else logging.INFO
+        level = logging.DEBUG if request.url.path in ("/health", "/", "/metrics") else logging.INFO
         logger.log(
             level,
-            "%s %s -> %d in %.0fms user=%s",
+            "%s %s -> %d in %.0fms user=%s auth_ms=%s db=%dq/%.1fms",
             request.method,
             request.url.path,
             status_code,
             duration_ms,
             actor,
+            auth,
+            queries.count,
+            queries.duration_ms,
         )
+        if settings.ENVIRONMENT == "development":
+            for problem in budget_warnings(request.scope.get("endpoint"), queries):
+                logger.warning("%s %s %s", request.method, request.url.path, problem)
         request_id_var.reset(token)
 
 app.add_middleware(
@@ -60,6 +99,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Answers-Cursor", "ETag"],
 )
 
 app.include_router(auth.router)
@@ -78,3 +118,14 @@ async def root():
 @app.get("/health", include_in_schema=False)
 async def health():
     return {"status": "ok", "version": settings.VERSION}
+
+
+@app.get(
+    "/metrics",
+    include_in_schema=False,
+    response_class=PlainTextResponse,
+    dependencies=[] if settings.METRICS_PUBLIC else [Depends(get_current_admin)],
+)
+async def metrics():
+    """Prometheus scrape target — per-process counters and histograms."""
+    return render_prometheus()
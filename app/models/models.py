@@ -42,6 +42,9 @@ class User(Base):
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
     )
+    # MaturitySummary of the latest completed session's report, written with
+    # that report so GET /auth/me reads one column rather than the reports.
+    maturity_summary: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
 
     sessions: Mapped[list["AssessmentSession"]] = relationship(back_populates="user")
 
@@ -88,6 +91,14 @@ class AssessmentSession(Base):
     completed_at: Mapped[Optional[datetime]] = mapped_column(
         TIMESTAMP(timezone=True), nullable=True
     )
+    # Distinct questions answered; bumped by the answer writes on first insert only.
+    answered_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    # Questions accessible at tier_at_time, snapshotted when the session starts.
+    total_questions: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     user: Mapped["User"] = relationship(back_populates="sessions")
     assessment: Mapped["Assessment"] = relationship(back_populates="sessions")
@@ -130,6 +141,17 @@ class Report(Base):
     scores: Mapped[dict] = mapped_column(JSONB, nullable=False)
     overall_score: Mapped[Decimal] = mapped_column(Numeric, nullable=False)
     tier_result: Mapped[str] = mapped_column(String, nullable=False)
+    # Everything GET /reports needs, fixed at submit time so reads never re-score.
+    recommendations: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    dimension_labels: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    radar_data: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
+    assessment_version: Mapped[int] = mapped_column(Integer, nullable=False)
+    # The same user's report on the same assessment just before this one, and
+    # its radar, recorded when this report is written.
+    previous_report_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("reports.id", ondelete="SET NULL"), nullable=True
+    )
+    previous_radar_data: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
     pdf_url: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     generated_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
@@ -9,8 +9,8 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.dependencies import get_current_admin
+from app.core.database import engine, get_db, pool_stats, read_engine
+from app.dependencies import get_current_admin, get_read_db, invalidate_user, user_cache
 from app.models.models import Assessment, AssessmentSession, Report, Response, SessionStatus, User
 from app.schemas.schemas import (
     AdminSessionOut,
@@ -21,6 +21,9 @@ from app.schemas.schemas import (
     UserRoleUpdate,
     UserTierUpdate,
 )
+from app.services import report_cache, token_introspection
+from app.services.answer_buffer import answer_buffer
+from app.services.session_sweeper import session_sweeper
 from app.services.xlsx_parser import parse_xlsx_to_assessment_config
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -45,7 +48,7 @@ async def admin_list_sessions(
 
 @router.get("/sessions/export")
 async def export_sessions_csv(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     _: User = Depends(get_current_admin),
 ):
     result = await db.execute(
@@ -75,7 +78,7 @@ async def export_sessions_csv(
 async def admin_analytics(
     from_date: Optional[datetime] = Query(None, alias="from"),
     to_date: Optional[datetime] = Query(None, alias="to"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     _: User = Depends(get_current_admin),
 ):
     total_q = select(func.count()).select_from(AssessmentSession)
@@ -149,6 +152,21 @@ async def admin_analytics(
     )
 
 
+@router.get("/metrics", response_model=dict)
+async def admin_metrics(
+    _: User = Depends(get_current_admin),
+):
+    """In-process counters for this replica (cache sizing, hit ratios)."""
+    return {
+        "identity_cache": user_cache.stats(),
+        "auth_introspection": token_introspection.introspector.stats(),
+        "db_pools": [pool_stats(e) for e in dict.fromkeys([engine, read_engine])],
+        "answer_buffer": answer_buffer.stats(),
+        "session_sweeper": session_sweeper.stats(),
+        "report_cache": report_cache.stats(),
+    }
+
+
 # ---------------------------------------------------------------------------
 # Users — literal paths before parameterized {user_id} routes
 # ---------------------------------------------------------------------------
@@ -164,7 +182,7 @@ async def admin_list_users(
 
 @router.get("/users/export")
 async def export_users_csv(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     _: User = Depends(get_current_admin),
 ):
     result = await db.execute(select(User).order_by(User.created_at.desc()))
@@ -221,6 +239,7 @@ async def update_user_role(
     user.role = body.role
     await db.commit()
     await db.refresh(user)
+    invalidate_user(user.id)
     return UserProfile.model_validate(user)
 
 
@@ -239,6 +258,7 @@ async def update_user_tier(
     user.tier = body.tier
     await db.commit()
     await db.refresh(user)
+    invalidate_user(user.id)
     return UserProfile.model_validate(user)
 
 
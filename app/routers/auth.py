@@ -1,16 +1,18 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.dependencies import get_current_user
+from app.core.query_stats import statement_budget
+from app.dependencies import get_current_user, get_read_db, invalidate_user, pin_reads_to_primary
 from app.models.models import User
-from app.schemas.schemas import UserProfile, UserUpdate
-from app.services import report_builder
+from app.schemas.schemas import MaturitySummary, UserProfile, UserUpdate
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=UserProfile)
+@statement_budget(2)
 async def register(
     body: UserUpdate,
     current_user: User = Depends(get_current_user),
@@ -25,20 +27,29 @@ async def register(
         current_user.company = body.company
         await db.commit()
         await db.refresh(current_user)
+        invalidate_user(current_user.id)
+        pin_reads_to_primary(current_user.id)
+    else:
+        await db.refresh(current_user, ["maturity_summary"])
     return UserProfile.model_validate(current_user)
 
 
 @router.get("/me", response_model=UserProfile)
+@statement_budget(1)
 async def me(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     profile = UserProfile.model_validate(current_user)
-    profile.maturity_summary = await report_builder.get_maturity_summary(current_user.id, db)
+    # maturity_summary moves on session submit, which only clears the identity
+    # cache of the instance that served it, so don't take it from the cached row.
+    summary = await db.scalar(select(User.maturity_summary).where(User.id == current_user.id))
+    profile.maturity_summary = MaturitySummary.model_validate(summary) if summary is not None else None
     return profile
 
 
 @router.patch("/me", response_model=UserProfile)
+@statement_budget(2)
 async def update_me(
     body: UserUpdate,
     current_user: User = Depends(get_current_user),
@@ -48,4 +59,8 @@ async def update_me(
         current_user.company = body.company
         await db.commit()
         await db.refresh(current_user)
+        invalidate_user(current_user.id)
+        pin_reads_to_primary(current_user.id)
+    else:
+        await db.refresh(current_user, ["maturity_summary"])
     return UserProfile.model_validate(current_user)
@@ -1,39 +1,66 @@
 import logging
 import uuid
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from fastapi.responses import RedirectResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.dependencies import get_current_user
+from app.core.query_stats import statement_budget
+from app.dependencies import get_current_user, get_read_db
 from app.models.models import AssessmentSession, Report, User
 from app.schemas.schemas import ReportOut
-from app.services import report_builder
+from app.services import report_builder, report_cache
+from app.utils.http import etag_matches
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
 
-@router.get("/{session_id}", response_model=ReportOut)
+@router.get(
+    "/{session_id}",
+    response_model=ReportOut,
+    responses={304: {"description": "Report unchanged since the ETag in If-None-Match"}},
+)
+@statement_budget(1)
 async def get_report(
     session_id: uuid.UUID,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    session = await db.get(AssessmentSession, session_id)
-    if not session:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-    if session.user_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    cached = report_cache.get(session_id)
+    if cached is None:
+        row = (
+            await db.execute(
+                select(AssessmentSession.user_id, Report)
+                .outerjoin(Report, Report.session_id == AssessmentSession.id)
+                .where(AssessmentSession.id == session_id)
+            )
+        ).first()
+        if not row:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        owner_id, report = row
+        _check_access(owner_id, current_user)
+        if report is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not yet generated")
+
+        cached = report_cache.put(session_id, owner_id, report_builder.to_report_out(report))
+    else:
+        _check_access(cached.owner_id, current_user)
+
+    headers = {"ETag": cached.etag}
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
 
-    out = await report_builder.get_report_out(session_id, db)
-    if not out:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not yet generated")
-    out.previous_radar_data = await report_builder.get_previous_radar_data(session, db)
-    return out
+
+def _check_access(owner_id: uuid.UUID, current_user: User) -> None:
+    if owner_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
 
 @router.get("/{session_id}/pdf")
@@ -46,8 +73,7 @@ async def get_pdf(
     session = await db.get(AssessmentSession, session_id)
     if not session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-    if session.user_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    _check_access(session.user_id, current_user)
 
     report = await db.scalar(select(Report).where(Report.session_id == session_id))
     if not report:
@@ -66,6 +92,7 @@ async def get_pdf(
             url = await generate_and_upload_pdf(report_out, assessment.name if assessment else "Assessment")
             report.pdf_url = url
             await db.commit()
+            report_cache.invalidate(session_id)
         except Exception:
             logger.exception("On-demand PDF generation failed for session %s", session_id)
             raise HTTPException(
@@ -1,20 +1,27 @@
 import asyncio
+import json
 import logging
 import uuid
-from datetime import datetime, timezone
-from decimal import Decimal
+from datetime import datetime, timedelta
+from typing import NoReturn, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi import Response as HttpResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.core.database import async_session_maker, get_db
-from app.dependencies import get_current_user
+from app.core.query_stats import statement_budget, untracked_context
+from app.dependencies import authenticate, get_current_user, get_read_db, invalidate_user, pin_reads_to_primary
 from app.models.models import Assessment, AssessmentSession, Report, Response, SessionStatus, User
-from app.schemas.schemas import AnswerIn, AnswerOut, ReportOut, SessionOut, SessionStartIn
-from app.services import report_builder
-from app.services.scoring import accessible_question_count
+from app.schemas.schemas import (
+    AnswerIn, AnswerOut, RadarPoint, ReportOut, SessionBootstrapOut, SessionOut, SessionStartIn,
+)
+from app.services import answers, assessment_summary, report_builder, report_cache
+from app.services.answer_buffer import answer_buffer
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.http import etag_matches, strong_etag
 
 logger = logging.getLogger(__name__)
 
@@ -23,8 +30,23 @@ router = APIRouter(prefix="/sessions", tags=["sessions"])
 # Strong references so fire-and-forget PDF tasks aren't garbage-collected mid-flight
 _background_tasks: set[asyncio.Task] = set()
 
+# Upper bound for POST /{id}/answers — larger than any assessment we ship.
+MAX_ANSWERS_PER_BATCH = 200
+MAX_SESSIONS_PER_PAGE = 100
+
+# answered_at is the writing transaction's start time, so a write can commit
+# with a timestamp slightly older than one a reader has already seen. Deltas
+# reach back this far past the cursor so such late commits aren't missed.
+ANSWER_SYNC_OVERLAP = timedelta(seconds=5)
+# A WebSocket that hasn't sent its auth message by then is closed with 4401.
+WS_AUTH_TIMEOUT_SECONDS = 10.0
+
+_answers_adapter = TypeAdapter(list[AnswerOut])
+_answers_in_adapter = TypeAdapter(list[AnswerIn])
+
 
 @router.post("/start", response_model=SessionOut, status_code=status.HTTP_201_CREATED)
+@statement_budget(3)
 async def start_session(
     body: SessionStartIn,
     current_user: User = Depends(get_current_user),
@@ -46,10 +68,14 @@ async def start_session(
         assessment_id=assessment.id,
         status=SessionStatus.in_progress,
         tier_at_time=current_user.tier,
+        total_questions=assessment_summary.scoring_plan(
+            assessment.id, assessment.version, assessment.config, current_user.tier.value,
+        ).question_count,
     )
     db.add(session)
     await db.commit()
     await db.refresh(session)
+    pin_reads_to_primary(current_user.id)
     logger.info(
         "session started: user=%s assessment=%s tier=%s session=%s",
         current_user.email, slug, session.tier_at_time.value, session.id,
@@ -58,6 +84,7 @@ async def start_session(
 
 
 @router.post("/{session_id}/answer", response_model=dict)
+@statement_budget(2)  # 1 on PostgreSQL, where the answered_count bump rides along with the upsert
 async def answer_question(
     session_id: uuid.UUID,
     body: AnswerIn,
@@ -68,140 +95,367 @@ async def answer_question(
     Record or update a single answer. Idempotent: re-submitting a question_id
     overwrites the previous answer.
     """
-    session = await _get_owned_session(session_id, current_user, db)
-    if session.status != SessionStatus.in_progress:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Session is not in progress")
+    await _write_answers(session_id, [body], current_user, db)
+    return {"ok": True}
+
 
-    # Upsert: delete existing answer for this question, then insert
-    existing = await db.scalar(
-        select(Response).where(
-            Response.session_id == session_id,
-            Response.question_id == body.question_id,
+@router.post("/{session_id}/answers", response_model=dict)
+@statement_budget(2)  # 1 on PostgreSQL, where the answered_count bump rides along with the upsert
+async def answer_questions(
+    session_id: uuid.UUID,
+    body: list[AnswerIn],
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Record or update several answers at once (e.g. a whole page of the quiz).
+    Same semantics as POST /answer, written in a single upsert.
+    """
+    if len(body) > MAX_ANSWERS_PER_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {MAX_ANSWERS_PER_BATCH} answers per request",
         )
-    )
-    if existing:
-        existing.answer_value = Decimal(str(body.answer_value))
-        existing.answered_at = datetime.now(timezone.utc)
-    else:
-        db.add(Response(
-            id=uuid.uuid4(),
-            session_id=session_id,
-            question_id=body.question_id,
-            dimension_id=body.dimension_id,
-            answer_value=Decimal(str(body.answer_value)),
-        ))
+    saved = await _write_answers(session_id, body, current_user, db)
+    return {"ok": True, "saved": saved}
 
-    await db.commit()
-    return {"ok": True}
+
+@router.websocket("/{session_id}/ws")
+async def answer_stream(
+    websocket: WebSocket,
+    session_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream answers over one connection instead of one HTTP request each.
+
+    The first message must be `{"type": "auth", "token": "<jwt>"}`, sent
+    within WS_AUTH_TIMEOUT_SECONDS; the token and session ownership are
+    checked once. Every later message is an answer
+    (or a list of answers) shaped like AnswerIn. Whatever arrives while a
+    write is in flight goes into the next upsert, and each write is
+    acknowledged with live progress. Failures close the socket with 4000 +
+    the HTTP status the REST endpoints would have returned.
+    """
+    await websocket.accept()
+    try:
+        user = await _authenticate_ws(websocket, db)
+        session = await _get_owned_session(session_id, user, db)
+        if session.status != SessionStatus.in_progress:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Session is not in progress")
+
+        total = session.total_questions
+        answered = set(await db.scalars(select(Response.question_id).where(Response.session_id == session_id)))
+        answered.update(a.question_id for a in answer_buffer.buffered(session_id))
+        await db.commit()  # end the read transaction; don't hold a connection while idle
+        answer_buffer.open(session_id, user.id)
+        await websocket.send_json({"type": "ready", **_progress(answered, total)})
+
+        await _stream_answers(websocket, session_id, user, db, answered, total)
+    except HTTPException as exc:
+        await websocket.close(code=4000 + exc.status_code, reason=str(exc.detail))
+    except WebSocketDisconnect:
+        pass
+
+
+async def _authenticate_ws(websocket: WebSocket, db: AsyncSession) -> User:
+    try:
+        hello = json.loads(await asyncio.wait_for(websocket.receive_text(), WS_AUTH_TIMEOUT_SECONDS))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No auth message received")
+    except ValueError:
+        hello = None
+    token = hello.get("token") if isinstance(hello, dict) and hello.get("type") == "auth" else None
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="First message must be auth")
+    return await authenticate(token, db)
+
+
+async def _stream_answers(
+    websocket: WebSocket,
+    session_id: uuid.UUID,
+    user: User,
+    db: AsyncSession,
+    answered: set[str],
+    total: int,
+) -> None:
+    inbox: asyncio.Queue[str | None] = asyncio.Queue()
+
+    async def read() -> None:
+        try:
+            while True:
+                await inbox.put(await websocket.receive_text())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            inbox.put_nowait(None)
+
+    reader = asyncio.create_task(read())
+    try:
+        closed = False
+        while not closed:
+            messages = [await inbox.get()]
+            while not inbox.empty():
+                messages.append(inbox.get_nowait())
+            if None in messages:
+                closed = True
+                messages = messages[:messages.index(None)]
+
+            batch: list[AnswerIn] = []
+            for raw in messages:
+                try:
+                    payload = json.loads(raw)
+                    items = payload if isinstance(payload, list) else [payload]
+                    # Validate the whole message first: applied completely or not at all.
+                    batch.extend(_answers_in_adapter.validate_python(items))
+                except (ValueError, ValidationError) as exc:
+                    if not closed:
+                        await websocket.send_json({"type": "error", "detail": str(exc)})
+
+            # Answers sent just before a disconnect are still saved.
+            for start in range(0, len(batch), MAX_ANSWERS_PER_BATCH):
+                chunk = batch[start:start + MAX_ANSWERS_PER_BATCH]
+                saved = await _write_answers(session_id, chunk, user, db)
+                answered.update(a.question_id for a in chunk)
+                if not closed:
+                    await websocket.send_json({"type": "ack", "saved": saved, **_progress(answered, total)})
+    finally:
+        reader.cancel()
+
+
+def _progress(answered: set[str], total: int) -> dict:
+    pct = min(round(len(answered) / total * 100), 100) if total > 0 else 0
+    return {"answered": len(answered), "total": total, "progress_pct": pct}
 
 
 @router.post("/{session_id}/submit", response_model=dict)
+@statement_budget(4)  # 2 on PostgreSQL, where the status change and users update ride along with the report insert
 async def submit_session(
     session_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Mark session completed, run scoring, generate report.
+    Mark session completed, run scoring, generate report — one transaction.
     Also triggers async PDF generation (fire-and-forget).
     """
-    session = await _get_owned_session(session_id, current_user, db)
-    if session.status != SessionStatus.in_progress:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Session already submitted or abandoned")
-
-    session.status = SessionStatus.completed
-    session.completed_at = datetime.now(timezone.utc)
-    await db.commit()
-
-    report_out = await report_builder.build_report(session_id, db)
+    async with answer_buffer.closing(session_id, current_user.id, db):
+        completed = await report_builder.complete_session(session_id, current_user.id, db)
+        if completed is None:
+            await _raise_transition_error(session_id, current_user, db, "Session already submitted or abandoned")
+    report_out, assessment_id = completed
+    # users.maturity_summary moved on; drop this instance's cached row.
+    invalidate_user(current_user.id)
+    # The results page loads the report straight after this — keep it off the replica.
+    pin_reads_to_primary(current_user.id)
     logger.info(
         "session submitted: user=%s session=%s score=%.1f result=%s",
         current_user.email, session_id, float(report_out.overall_score), report_out.tier_result,
     )
 
-    task = asyncio.create_task(_generate_pdf_background(report_out, session.assessment_id))
+    task = asyncio.create_task(
+        _generate_pdf_background(report_out, assessment_id),
+        context=untracked_context(),
+    )
     _background_tasks.add(task)
     task.add_done_callback(_background_tasks.discard)
 
     return {"ok": True, "report_id": str(report_out.id)}
 
 
-@router.get("/{session_id}/answers", response_model=list[AnswerOut])
+@router.get(
+    "/{session_id}/answers",
+    response_model=list[AnswerOut],
+    responses={304: {"description": "Answers unchanged since the ETag in If-None-Match"}},
+)
+@statement_budget(2)
 async def get_session_answers(
     session_id: uuid.UUID,
+    since: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    """
+    Saved answers for a session. With `since` (the X-Answers-Cursor from an
+    earlier call) only answers written after that point come back, plus a
+    few seconds of overlap; clients merge by question_id. A matching
+    If-None-Match gets 304 with no body.
+    """
     await _get_owned_session(session_id, current_user, db)
-    result = await db.execute(
-        select(Response).where(Response.session_id == session_id)
+    stmt = (
+        select(Response.question_id, Response.dimension_id, Response.answer_value, Response.answered_at)
+        .where(Response.session_id == session_id)
+        .order_by(Response.answered_at, Response.question_id)
+    )
+    if since is not None:
+        stmt = stmt.where(Response.answered_at > _decode_answers_cursor(since) - ANSWER_SYNC_OVERLAP)
+    rows = (await db.execute(stmt)).all()
+
+    out = {r.question_id: AnswerOut.model_validate(r) for r in rows}
+    # Write-behind mode: answers acknowledged but not flushed yet win, and are
+    # always part of a delta since they have no answered_at yet.
+    for answer in answer_buffer.buffered(session_id):
+        out[answer.question_id] = AnswerOut.model_validate(answer.model_dump())
+
+    body = _answers_adapter.dump_json(list(out.values()))
+    headers = {"ETag": strong_etag(body)}
+    if rows:
+        headers["X-Answers-Cursor"] = encode_cursor(rows[-1].answered_at.isoformat())
+    elif since is not None:
+        headers["X-Answers-Cursor"] = since
+    if etag_matches(if_none_match, headers["ETag"]):
+        return HttpResponse(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return HttpResponse(content=body, media_type="application/json", headers=headers)
+
+
+def _decode_answers_cursor(cursor: str) -> datetime:
+    try:
+        [answered_at] = decode_cursor(cursor, 1)
+        return datetime.fromisoformat(answered_at)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid cursor") from None
+
+
+@router.get("/{session_id}/bootstrap", response_model=SessionBootstrapOut)
+@statement_budget(2)
+async def bootstrap_session(
+    session_id: uuid.UUID,
+    response: HttpResponse,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Resume a quiz in one call: the assessment as the session's tier sees it,
+    the saved answers and progress. X-Answers-Cursor is set as on
+    GET /{id}/answers, so the client can delta-sync from here.
+    """
+    row = (
+        await db.execute(
+            select(AssessmentSession, Assessment)
+            .join(Assessment, Assessment.id == AssessmentSession.assessment_id)
+            .where(AssessmentSession.id == session_id)
+        )
+    ).first()
+    session, assessment = row if row else (None, None)
+    _check_owned(session, current_user)
+
+    rows = (
+        await db.execute(
+            select(Response.question_id, Response.dimension_id, Response.answer_value, Response.answered_at)
+            .where(Response.session_id == session_id)
+            .order_by(Response.answered_at, Response.question_id)
+        )
+    ).all()
+    out = {r.question_id: AnswerOut.model_validate(r) for r in rows}
+    for answer in answer_buffer.buffered(session_id):
+        out[answer.question_id] = AnswerOut.model_validate(answer.model_dump())
+    if rows:
+        response.headers["X-Answers-Cursor"] = encode_cursor(rows[-1].answered_at.isoformat())
+
+    data = SessionOut.model_validate(session)
+    data.assessment_name = assessment.name
+    data.assessment_slug = assessment.slug
+    return SessionBootstrapOut(
+        session=data,
+        assessment=assessment_summary.assessment_view(assessment, session.tier_at_time.value),
+        answers=list(out.values()),
+        **_progress(set(out), session.total_questions),
     )
-    return [AnswerOut.model_validate(r) for r in result.scalars().all()]
 
 
 @router.patch("/{session_id}/abandon", response_model=dict)
+@statement_budget(1)
 async def abandon_session(
     session_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    session = await _get_owned_session(session_id, current_user, db)
-    if session.status != SessionStatus.in_progress:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Session is not in progress")
-    session.status = SessionStatus.abandoned
-    await db.commit()
+    async with answer_buffer.closing(session_id, current_user.id, db):
+        abandoned = await db.scalar(
+            update(AssessmentSession)
+            .where(
+                AssessmentSession.id == session_id,
+                AssessmentSession.user_id == current_user.id,
+                AssessmentSession.status == SessionStatus.in_progress,
+            )
+            .values(status=SessionStatus.abandoned)
+            .returning(AssessmentSession.id)
+        )
+        if abandoned is None:
+            await _raise_transition_error(session_id, current_user, db, "Session is not in progress")
+        await db.commit()
+    pin_reads_to_primary(current_user.id)
     return {"ok": True}
 
 
 @router.get("", response_model=list[SessionOut])
+@statement_budget(1)
 async def list_sessions(
+    response: HttpResponse,
+    limit: int = Query(50, ge=1, le=MAX_SESSIONS_PER_PAGE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(
-        select(AssessmentSession)
-        .options(selectinload(AssessmentSession.assessment))
+    """
+    The user's sessions, newest first, one page at a time. Pages are keyed on
+    (started_at, id) so they stay stable while new sessions are started; the
+    cursor for the next page comes back in X-Next-Cursor.
+    """
+    stmt = (
+        select(
+            AssessmentSession.id,
+            AssessmentSession.assessment_id,
+            AssessmentSession.status,
+            AssessmentSession.tier_at_time,
+            AssessmentSession.started_at,
+            AssessmentSession.completed_at,
+            AssessmentSession.answered_count,
+            AssessmentSession.total_questions,
+            Assessment.name,
+            Assessment.slug,
+            Report.overall_score,
+            Report.tier_result,
+            Report.radar_data,
+        )
+        .join(Assessment, Assessment.id == AssessmentSession.assessment_id)
+        .outerjoin(Report, Report.session_id == AssessmentSession.id)
         .where(AssessmentSession.user_id == current_user.id)
-        .order_by(AssessmentSession.started_at.desc())
+        .order_by(AssessmentSession.started_at.desc(), AssessmentSession.id.desc())
+        .limit(limit + 1)
     )
-    sessions = result.scalars().all()
-    session_ids = [s.id for s in sessions]
-
-    reports_by_session: dict[uuid.UUID, Report] = {}
-    answer_counts: dict[uuid.UUID, int] = {}
-    if session_ids:
-        reports = await db.execute(select(Report).where(Report.session_id.in_(session_ids)))
-        reports_by_session = {r.session_id: r for r in reports.scalars().all()}
-
-        in_progress_ids = [s.id for s in sessions if s.status == SessionStatus.in_progress]
-        if in_progress_ids:
-            counts = await db.execute(
-                select(Response.session_id, func.count(Response.id))
-                .where(Response.session_id.in_(in_progress_ids))
-                .group_by(Response.session_id)
-            )
-            answer_counts = {sid: n for sid, n in counts.all()}
+    if cursor is not None:
+        after_started, after_id = _decode_session_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(AssessmentSession.started_at, AssessmentSession.id) < tuple_(after_started, after_id)
+        )
+    rows = (await db.execute(stmt)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].started_at.isoformat(), rows[-1].id)
 
     out = []
-    for s in sessions:
-        data = SessionOut.model_validate(s)
-        if s.assessment:
-            data.assessment_name = s.assessment.name
-            data.assessment_slug = s.assessment.slug
-
-        report = reports_by_session.get(s.id)
-        if report:
-            data.score = float(report.overall_score)
-            data.tier_result = report.tier_result
-            if s.status == SessionStatus.completed and s.assessment:
-                data.dimension_scores = report_builder.build_radar_data(
-                    report.scores, s.assessment.config
-                )
-
-        if s.status == SessionStatus.in_progress and s.assessment:
-            total = accessible_question_count(s.assessment.config, s.tier_at_time.value)
-            if total > 0:
-                data.progress_pct = min(round(answer_counts.get(s.id, 0) / total * 100), 100)
+    for r in rows:
+        data = SessionOut(
+            id=r.id,
+            assessment_id=r.assessment_id,
+            status=r.status,
+            tier_at_time=r.tier_at_time,
+            started_at=r.started_at,
+            completed_at=r.completed_at,
+            assessment_name=r.name,
+            assessment_slug=r.slug,
+        )
+        if r.overall_score is not None:
+            data.score = float(r.overall_score)
+            data.tier_result = r.tier_result
+            if r.status == SessionStatus.completed:
+                data.dimension_scores = [RadarPoint(**point) for point in r.radar_data]
+
+        if r.status == SessionStatus.in_progress:
+            if r.total_questions > 0:
+                data.progress_pct = min(round(r.answered_count / r.total_questions * 100), 100)
             else:
                 data.progress_pct = 0
 
@@ -209,17 +463,71 @@ async def list_sessions(
     return out
 
 
+def _decode_session_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        started_at, session_id = decode_cursor(cursor, 2)
+        return datetime.fromisoformat(started_at), uuid.UUID(session_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid cursor") from None
+
+
 async def _get_owned_session(
     session_id: uuid.UUID,
     current_user: User,
     db: AsyncSession,
 ) -> AssessmentSession:
     session = await db.get(AssessmentSession, session_id)
+    _check_owned(session, current_user)
+    return session
+
+
+def _check_owned(session: AssessmentSession | None, current_user: User) -> None:
     if not session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
     if session.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not your session")
-    return session
+
+
+async def _raise_transition_error(
+    session_id: uuid.UUID,
+    current_user: User,
+    db: AsyncSession,
+    conflict_detail: str,
+) -> NoReturn:
+    """A conditional status UPDATE matched no row: say why (404, 403 or 409)."""
+    session = (
+        await db.execute(
+            select(AssessmentSession.id, AssessmentSession.user_id)
+            .where(AssessmentSession.id == session_id)
+        )
+    ).first()
+    _check_owned(session, current_user)
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=conflict_detail)
+
+
+async def _write_answers(
+    session_id: uuid.UUID,
+    body: list[AnswerIn],
+    current_user: User,
+    db: AsyncSession,
+) -> int:
+    """Ownership/status check and upsert in one round trip; same errors as _get_owned_session.
+
+    In write-behind mode, once a session has passed that check in this process
+    its answers go to the in-memory buffer instead.
+    """
+    if answer_buffer.accepts(session_id, current_user.id):
+        return answer_buffer.add(session_id, current_user.id, body)
+    result = await answers.write_answers(session_id, current_user.id, body, db)
+    if result.owner_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    if result.owner_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not your session")
+    if result.status != SessionStatus.in_progress:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Session is not in progress")
+    await db.commit()
+    answer_buffer.open(session_id, current_user.id)
+    return result.saved
 
 
 async def _generate_pdf_background(
@@ -243,5 +551,6 @@ async def _generate_pdf_background(
             if report:
                 report.pdf_url = url
                 await db.commit()
+                report_cache.invalidate(report_out.session_id)
     except Exception:
         logger.exception("PDF generation failed for session %s", report_out.session_id)
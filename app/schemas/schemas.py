@@ -133,6 +133,16 @@ class AnswerOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class SessionBootstrapOut(BaseModel):
+    """Everything the quiz page needs to resume a session, in one response."""
+    session: SessionOut
+    assessment: AssessmentOut           # filtered to the session's tier_at_time
+    answers: list[AnswerOut]
+    answered: int
+    total: int
+    progress_pct: int
+
+
 # ---------------------------------------------------------------------------
 # Reports
 # ---------------------------------------------------------------------------
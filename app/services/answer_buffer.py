@@ -0,0 +1,224 @@
+"""
+Optional write-behind buffer for session answers (ANSWER_WRITE_BEHIND).
+
+Users often click through a scale several times before settling on an answer.
+With the buffer on, answers are held in memory per session and acknowledged
+immediately; only the latest value per question survives, and the buffer is
+written to the database every ANSWER_FLUSH_INTERVAL_SECONDS, in the same
+transaction that submits or abandons a session, and on graceful shutdown.
+A session being submitted or abandoned is no longer buffered: answers that
+arrive meanwhile take the guarded upsert and wait for, then fail against,
+the close (409), instead of being acknowledged and lost.
+
+A session's first answer still goes straight to the database through the
+guarded upsert, which proves ownership and status; after that the session is
+open here and later answers are buffered. Flushes use the same guarded upsert,
+so answers buffered for a session that was meanwhile closed elsewhere are
+dropped rather than written into a finished session.
+
+Buffered answers live in this process only: they are lost if it dies without
+a graceful shutdown, and `GET /sessions/{id}/answers` served by another worker
+won't see them until the next flush. Likewise `progress_pct` in `GET /sessions`
+reads the session's answered_count, which only moves when answers are written.
+"""
+import asyncio
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.metrics import Counter, Gauge
+from app.models.models import SessionStatus
+from app.schemas.schemas import AnswerIn
+from app.services.answers import write_answers
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+ANSWER_BUFFER_WRITES = Counter(
+    "answer_buffer_answers_total",
+    "Answers through the write-behind buffer by outcome (buffered, coalesced, flushed, dropped)",
+    ["outcome"],
+)
+
+
+@dataclass
+class _SessionAnswers:
+    user_id: uuid.UUID
+    answers: dict[str, AnswerIn] = field(default_factory=dict)
+
+
+class AnswerBuffer:
+    def __init__(self, enabled: bool, flush_interval_seconds: float, session_maker=async_session_maker):
+        self.enabled = enabled
+        self.flush_interval_seconds = flush_interval_seconds
+        self.session_maker = session_maker
+        # session_id -> owner, for sessions whose guarded write succeeded here
+        self._open: TTLCache[uuid.UUID] = TTLCache(maxsize=10_000, ttl_seconds=3600)
+        self._pending: dict[uuid.UUID, _SessionAnswers] = {}
+        # Taken out of _pending by the flush in progress; still visible to reads.
+        self._flushing: dict[uuid.UUID, _SessionAnswers] = {}
+        # Sessions being submitted/abandoned, with the answers written by that
+        # uncommitted close (likewise visible to reads); then ones that closed.
+        self._closing: dict[uuid.UUID, _SessionAnswers] = {}
+        self._closed: TTLCache[bool] = TTLCache(maxsize=10_000, ttl_seconds=3600)
+        # One flush at a time, so an older value can never land after a newer one.
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def accepts(self, session_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+        return self.enabled and self._open.get(session_id) == user_id
+
+    def open(self, session_id: uuid.UUID, user_id: uuid.UUID) -> None:
+        """Mark a session as verified (owned by `user_id`, in progress)."""
+        # A guarded write that beat a close here must not reopen the session.
+        if self.enabled and session_id not in self._closing and self._closed.get(session_id) is None:
+            self._open.set(session_id, user_id)
+
+    def add(self, session_id: uuid.UUID, user_id: uuid.UUID, answers: list[AnswerIn]) -> int:
+        """Buffer answers for an open session; returns distinct questions accepted."""
+        entry = self._pending.setdefault(session_id, _SessionAnswers(user_id))
+        for answer in answers:
+            if answer.question_id in entry.answers:
+                ANSWER_BUFFER_WRITES.inc(outcome="coalesced")
+            entry.answers[answer.question_id] = answer
+        ANSWER_BUFFER_WRITES.inc(len(answers), outcome="buffered")
+        return len({a.question_id for a in answers})
+
+    def buffered(self, session_id: uuid.UUID) -> list[AnswerIn]:
+        """Answers accepted for a session but not yet committed, newest value per question."""
+        merged: dict[str, AnswerIn] = {}
+        for source in (self._closing, self._flushing, self._pending):
+            entry = source.get(session_id)
+            if entry is not None:
+                merged.update(entry.answers)
+        return list(merged.values())
+
+    def pending_count(self) -> int:
+        return sum(len(entry.answers) for entry in self._pending.values())
+
+    async def flush(self, session_id: Optional[uuid.UUID] = None) -> None:
+        """Write and commit pending answers for one session, or for all of them."""
+        async with self._lock:
+            ids = [session_id] if session_id is not None else list(self._pending)
+            batch = {sid: self._pending.pop(sid) for sid in ids if sid in self._pending}
+            if not batch:
+                return
+            self._flushing = batch
+            try:
+                async with self.session_maker() as db:
+                    await self._write(batch, db)
+                    await db.commit()
+            except BaseException:
+                # Put the batch back underneath anything that arrived since.
+                for sid, entry in batch.items():
+                    newer = self._pending.get(sid)
+                    if newer is not None:
+                        entry.answers.update(newer.answers)
+                    self._pending[sid] = entry
+                raise
+            finally:
+                self._flushing = {}
+
+    async def _write(self, batch: dict[uuid.UUID, _SessionAnswers], db: AsyncSession) -> None:
+        for sid, entry in batch.items():
+            answers = list(entry.answers.values())
+            result = await write_answers(sid, entry.user_id, answers, db)
+            if result.owner_id == entry.user_id and result.status == SessionStatus.in_progress:
+                ANSWER_BUFFER_WRITES.inc(len(answers), outcome="flushed")
+            else:
+                ANSWER_BUFFER_WRITES.inc(len(answers), outcome="dropped")
+                self._open.invalidate(sid)
+                logger.warning(
+                    "dropped %d buffered answers for session %s (status=%s)",
+                    len(answers), sid, result.status.value if result.status else "missing",
+                )
+
+    @asynccontextmanager
+    async def closing(self, session_id: uuid.UUID, user_id: uuid.UUID, db: AsyncSession):
+        """
+        Submit/abandon a session: the block must run and commit the close in
+        `db`. On entry the session stops being buffered and, if `user_id` owns
+        them, its buffered answers are written in `db`. If the block raises,
+        the answers go back into the buffer and the session is open again.
+        """
+        async with self._lock:
+            entry = self._pending.get(session_id)
+            owner = entry.user_id if entry is not None else self._open.get(session_id)
+            # Someone else's session: the caller's guarded close will fail, leave it be.
+            mine = owner is None or owner == user_id
+            if mine:
+                self._open.invalidate(session_id)
+                self._closing[session_id] = self._pending.pop(session_id, None) or _SessionAnswers(user_id)
+                answers = list(self._closing[session_id].answers.values())
+                try:
+                    if answers:
+                        await write_answers(session_id, user_id, answers, db)
+                except BaseException:
+                    self._reopen(session_id, owner)
+                    raise
+        if not mine:
+            yield
+            return
+        try:
+            yield
+        except BaseException:
+            self._reopen(session_id, owner)
+            raise
+        self._closing.pop(session_id, None)
+        self._closed.set(session_id, True)
+
+    def _reopen(self, session_id: uuid.UUID, owner: Optional[uuid.UUID]) -> None:
+        """Undo `closing` after the close failed or rolled back."""
+        entry = self._closing.pop(session_id, None)
+        if entry is not None and entry.answers:
+            newer = self._pending.get(session_id)
+            if newer is not None:
+                entry.answers.update(newer.answers)
+            self._pending[session_id] = entry
+        if owner is not None:
+            self.open(session_id, owner)
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("answer buffer flush failed; will retry")
+
+    async def stop(self) -> None:
+        """Stop the timer and write whatever is left (graceful shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "open_sessions": len(self._open),
+            "pending_sessions": len(self._pending),
+            "pending_answers": self.pending_count(),
+        }
+
+
+answer_buffer = AnswerBuffer(
+    enabled=settings.ANSWER_WRITE_BEHIND,
+    flush_interval_seconds=settings.ANSWER_FLUSH_INTERVAL_SECONDS,
+)
+
+Gauge("answer_buffer_pending", "Answers accepted but not yet written", answer_buffer.pending_count)
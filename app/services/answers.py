@@ -0,0 +1,145 @@
+"""
+Writes session answers to the responses table.
+Every write is an upsert on uq_responses_session_question, so re-answering a
+question overwrites the previous value. All answer writes go through
+`write_answers`, which also keeps `assessment_sessions.answered_count` in step.
+"""
+import uuid
+from decimal import Decimal
+from typing import NamedTuple
+
+from sqlalchemy import Boolean, exists, func, literal, literal_column, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import dialect_insert
+from app.models.models import AssessmentSession, Response, SessionStatus
+from app.schemas.schemas import AnswerIn
+
+_COLUMNS = ("id", "session_id", "question_id", "dimension_id", "answer_value")
+
+
+class AnswerWrite(NamedTuple):
+    """Outcome of `write_answers`. `owner_id` is None if the session doesn't exist."""
+    owner_id: uuid.UUID | None
+    status: SessionStatus | None
+    saved: int
+
+
+def _rows(session_id: uuid.UUID, answers: list[AnswerIn]) -> list[dict]:
+    # Last value wins per question: one statement can't update the same row twice.
+    latest = {a.question_id: a for a in answers}
+    return [
+        {
+            "id": uuid.uuid4(),
+            "session_id": session_id,
+            "question_id": a.question_id,
+            "dimension_id": a.dimension_id,
+            "answer_value": Decimal(str(a.answer_value)),
+        }
+        for a in latest.values()
+    ]
+
+
+def _on_conflict(stmt):
+    return stmt.on_conflict_do_update(
+        index_elements=[Response.session_id, Response.question_id],
+        set_={
+            "dimension_id": stmt.excluded.dimension_id,
+            "answer_value": stmt.excluded.answer_value,
+            "answered_at": func.now(),
+        },
+    )
+
+
+async def write_answers(
+    session_id: uuid.UUID,
+    user_id: uuid.UUID,
+    answers: list[AnswerIn],
+    db: AsyncSession,
+) -> AnswerWrite:
+    """
+    Upsert answers only if the session belongs to `user_id` and is in progress,
+    and add the newly answered questions to the session's answered_count.
+    Does not commit.
+
+    On PostgreSQL this is one statement: a CTE locks the session row (so a
+    concurrent submit can't slip in between check and write), the
+    INSERT ... SELECT writes nothing unless the guard holds, a second CTE
+    bumps answered_count by the rows that were inserted rather than updated
+    (xmax = 0), and the outer SELECT returns the session's owner and status
+    for the caller to map to 404/403/409. SQLite can't put DML in a CTE, so
+    there the guarded insert runs alone, answered_count is recounted after a
+    successful write, and the session is only looked up when it wrote nothing.
+    """
+    rows = _rows(session_id, answers)
+    if not rows:
+        return await _session_state(session_id, db, saved=0)
+
+    incoming = union_all(*(
+        select(*(literal(row[c], Response.__table__.c[c].type).label(c) for c in _COLUMNS))
+        for row in rows
+    )).subquery("incoming")
+    insert = dialect_insert(db, Response)
+
+    if db.bind.dialect.name == "sqlite":
+        guard = exists().where(
+            AssessmentSession.id == session_id,
+            AssessmentSession.user_id == user_id,
+            AssessmentSession.status == SessionStatus.in_progress,
+        )
+        stmt = _on_conflict(insert.from_select(_COLUMNS, select(incoming).where(guard)))
+        saved = len((await db.execute(stmt.returning(Response.id))).all())
+        if not saved:
+            return await _session_state(session_id, db, saved=0)
+        await db.execute(
+            update(AssessmentSession)
+            .where(AssessmentSession.id == session_id)
+            .values(
+                answered_count=select(func.count(Response.id))
+                .where(Response.session_id == session_id)
+                .scalar_subquery()
+            )
+        )
+        return AnswerWrite(user_id, SessionStatus.in_progress, saved)
+
+    # FOR NO KEY UPDATE rather than FOR SHARE: the same statement updates
+    # the row below, and two writers each holding a share lock would deadlock.
+    target = (
+        select(AssessmentSession.user_id, AssessmentSession.status)
+        .where(AssessmentSession.id == session_id)
+        .with_for_update(key_share=True)
+        .cte("target")
+    )
+    guard = exists().where(
+        target.c.user_id == user_id,
+        target.c.status == SessionStatus.in_progress,
+    )
+    written = (
+        _on_conflict(insert.from_select(_COLUMNS, select(incoming).where(guard)))
+        .returning(Response.id, literal_column("xmax = 0", Boolean).label("inserted"))
+        .cte("written")
+    )
+    inserted = select(func.count()).select_from(written).where(written.c.inserted).scalar_subquery()
+    bumped = (
+        update(AssessmentSession)
+        .where(AssessmentSession.id == session_id, inserted > 0)
+        .values(answered_count=AssessmentSession.answered_count + inserted)
+        .cte("bumped")
+    )
+    stmt = select(
+        target.c.user_id,
+        target.c.status,
+        select(func.count()).select_from(written).scalar_subquery(),
+    ).add_cte(bumped)
+    row = (await db.execute(stmt)).first()
+    return AnswerWrite(*row) if row else AnswerWrite(None, None, 0)
+
+
+async def _session_state(session_id: uuid.UUID, db: AsyncSession, saved: int) -> AnswerWrite:
+    row = (
+        await db.execute(
+            select(AssessmentSession.user_id, AssessmentSession.status)
+            .where(AssessmentSession.id == session_id)
+        )
+    ).first()
+    return AnswerWrite(*row, saved) if row else AnswerWrite(None, None, saved)
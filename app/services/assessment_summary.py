@@ -0,0 +1,72 @@
+"""
+Cached tier-filtered views of an assessment config.
+
+Everything a tier sees of an assessment is the same for every user on that
+tier: the compiled ScoringPlan (scoring and progress totals) and the
+AssessmentOut the quiz lists. Both are built once per
+(assessment_id, version, tier) and cached; the admin importer bumps
+`version` whenever it replaces a config, so a cached entry never outlives
+the config it came from.
+"""
+import uuid
+
+from app.models.models import Assessment
+from app.schemas.schemas import AssessmentOut, DimensionOut, QuestionOut
+from app.services.scoring import ScoringPlan, compile_plan
+from app.utils.cache import TTLCache
+
+_plans: TTLCache[ScoringPlan] = TTLCache(maxsize=1_000, ttl_seconds=3600)
+_views: TTLCache[AssessmentOut] = TTLCache(maxsize=1_000, ttl_seconds=3600)
+
+
+def scoring_plan(assessment_id: uuid.UUID, version: int, config: dict, tier: str) -> ScoringPlan:
+    """`config` compiled for `tier`; compiled once per (id, version, tier)."""
+    key = (assessment_id, version, tier)
+    plan = _plans.get(key)
+    if plan is None:
+        plan = compile_plan(config, tier)
+        _plans.set(key, plan)
+    return plan
+
+
+def assessment_view(assessment: Assessment, tier: str) -> AssessmentOut:
+    """The assessment as a user on `tier` sees it; built once per (id, version, tier)."""
+    key = (assessment.id, assessment.version, tier)
+    view = _views.get(key)
+    if view is None:
+        view = _build_assessment_out(assessment, tier)
+        _views.set(key, view)
+    return view
+
+
+def _build_assessment_out(assessment: Assessment, tier: str) -> AssessmentOut:
+    plan = scoring_plan(assessment.id, assessment.version, assessment.config, tier)
+    questions: list[list[QuestionOut]] = [[] for _ in plan.dimension_ids]
+    for dim_index, q, max_score in zip(plan.question_dims, plan.questions, plan.question_max_scores):
+        questions[dim_index].append(QuestionOut(
+            id=q["id"],
+            text=q["text"],
+            tier=q.get("tier", "free"),
+            type=q.get("type", "scale"),
+            options=q.get("options"),
+            max_score=max_score,
+        ))
+
+    return AssessmentOut(
+        id=assessment.id,
+        slug=assessment.slug,
+        name=assessment.name,
+        description=assessment.description,
+        version=assessment.version,
+        dimensions=[
+            DimensionOut(id=dim_id, name=name, weight=weight, questions=dim_questions)
+            for dim_id, name, weight, dim_questions in zip(
+                plan.dimension_ids, plan.dimension_names, plan.dimension_weights, questions,
+            )
+        ],
+    )
+
+
+def clear() -> None:
+    _plans.clear()
+    _views.clear()
@@ -5,159 +5,191 @@ Calls the scoring service, writes to the reports table, and optionally triggers
 import uuid
 from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import TIMESTAMP, cast, exists, func, or_, select, tuple_, update
+from sqlalchemy.orm import aliased
 
-from app.models.models import AssessmentSession, Report, Response, Assessment, SessionStatus
-from app.schemas.schemas import MaturitySummary, RadarPoint, ReportOut
-from app.services.scoring import score_responses, ScoringResult
+from app.core.database import dialect_insert
+from app.models.models import AssessmentSession, Report, Response, Assessment, SessionStatus, User
+from app.schemas.schemas import MaturitySummary, ReportOut
+from app.services import assessment_summary
+from app.services.scoring import score_plan, ScoringResult
 
 
-async def build_report(session_id: uuid.UUID, db: AsyncSession) -> ReportOut:
+async def complete_session(
+    session_id: uuid.UUID, user_id: uuid.UUID, db: AsyncSession
+) -> tuple[ReportOut, uuid.UUID] | None:
     """
-    Fetch all responses for a session, run scoring, persist a Report row,
-    and return a fully populated ReportOut.
-    Idempotent: if a report already exists for the session, return it.
+    Complete an in-progress session owned by `user_id`, score it and write its
+    Report, committing once. Returns (report, assessment_id), or None if no
+    such in-progress session exists (the caller works out why).
+
+    The transition is a conditional UPDATE ... WHERE status = 'in_progress'
+    RETURNING, so of two concurrent submits exactly one matches; no explicit
+    row lock. On PostgreSQL the UPDATE sits in a CTE whose outer SELECT also
+    returns the assessment config and the responses, so scoring needs no
+    further reads. The report insert is guarded by ON CONFLICT (session_id):
+    an existing report is kept and returned, never duplicated. The stored
+    report carries everything GET /reports serves (see `report_payload`),
+    including the predecessor's radar, looked up inside the same INSERT, and
+    the user's `maturity_summary` is pointed at it if the INSERT wrote a row
+    and no later completion got there first (on PostgreSQL a CTE that reads
+    the INSERT's RETURNING). Callers must invalidate the cached users row.
     """
-    # Return existing report if already built
-    existing = await db.scalar(
-        select(Report).where(Report.session_id == session_id)
-    )
-    if existing:
-        return _to_report_out(existing, {})
-
-    # Load session + assessment config
-    session = await db.get(AssessmentSession, session_id)
-    if not session:
-        raise ValueError(f"Session {session_id} not found")
-
-    assessment = await db.get(Assessment, session.assessment_id)
-    if not assessment:
-        raise ValueError(f"Assessment {session.assessment_id} not found")
-
-    # Load responses
-    result = await db.execute(
-        select(Response).where(Response.session_id == session_id)
+    completed_at = datetime.now(timezone.utc)
+    transition = (
+        update(AssessmentSession)
+        .where(
+            AssessmentSession.id == session_id,
+            AssessmentSession.user_id == user_id,
+            AssessmentSession.status == SessionStatus.in_progress,
+        )
+        .values(status=SessionStatus.completed, completed_at=completed_at)
+        .returning(AssessmentSession.id, AssessmentSession.assessment_id, AssessmentSession.tier_at_time)
     )
-    raw_responses = [
-        {
-            "question_id": r.question_id,
-            "dimension_id": r.dimension_id,
-            "answer_value": float(r.answer_value),
-        }
-        for r in result.scalars().all()
-    ]
-
-    scored: ScoringResult = score_responses(
-        responses=raw_responses,
-        config=assessment.config,
-        tier=session.tier_at_time.value,
+    answer_cols = (Response.question_id, Response.dimension_id, Response.answer_value)
+
+    if db.bind.dialect.name == "sqlite":
+        # No UPDATE inside a CTE on SQLite: transition, then read.
+        done = (await db.execute(transition)).first()
+        if done is None:
+            return None
+        assessment_id, tier = done.assessment_id, done.tier_at_time
+        rows = (
+            await db.execute(
+                select(Assessment.config, Assessment.version, *answer_cols)
+                .outerjoin(Response, Response.session_id == session_id)
+                .where(Assessment.id == assessment_id)
+            )
+        ).all()
+    else:
+        done = transition.cte("done")
+        rows = (
+            await db.execute(
+                select(done.c.assessment_id, done.c.tier_at_time, Assessment.config, Assessment.version, *answer_cols)
+                .join(Assessment, Assessment.id == done.c.assessment_id)
+                .outerjoin(Response, Response.session_id == done.c.id)
+            )
+        ).all()
+        if not rows:
+            return None
+        assessment_id, tier = rows[0].assessment_id, rows[0].tier_at_time
+
+    scored = score_plan(
+        [
+            {
+                "question_id": r.question_id,
+                "dimension_id": r.dimension_id,
+                "answer_value": float(r.answer_value),
+            }
+            for r in rows
+            if r.question_id is not None
+        ],
+        assessment_summary.scoring_plan(assessment_id, rows[0].version, rows[0].config, tier.value),
     )
 
-    report = Report(
+    payload = report_payload(scored, rows[0].version)
+    previous = _previous_report(user_id, assessment_id, session_id, completed_at)
+    insert = dialect_insert(db, Report).values(
         id=uuid.uuid4(),
         session_id=session_id,
-        scores=scored.dimension_scores,
-        overall_score=scored.overall_score,
-        tier_result=scored.tier_result,
-        generated_at=datetime.now(timezone.utc),
-    )
-    db.add(report)
+        **payload,
+        previous_report_id=previous.with_only_columns(Report.id).scalar_subquery(),
+        previous_radar_data=previous.with_only_columns(Report.radar_data).scalar_subquery(),
+        generated_at=completed_at,
+    ).on_conflict_do_nothing(index_elements=[Report.session_id])
+    latest = _set_maturity_summary(db, user_id, maturity_summary(payload, session_id, completed_at), completed_at)
+    if db.bind.dialect.name == "sqlite":
+        stmt = insert.returning(Report)
+        report = (await db.execute(stmt, execution_options={"populate_existing": True})).scalar_one_or_none()
+        if report is not None:
+            await db.execute(latest)
+    else:
+        written = insert.returning(*Report.__table__.c).cte("written")
+        latest = latest.where(exists(select(written.c.id))).cte("latest")
+        stmt = select(aliased(Report, written)).add_cte(latest)
+        report = (await db.execute(stmt, execution_options={"populate_existing": True})).scalar_one_or_none()
+    if report is None:
+        report = await db.scalar(select(Report).where(Report.session_id == session_id))
     await db.commit()
-    await db.refresh(report)
-
-    return _to_report_out(report, scored)
-
-
-def build_radar_data(scores: dict, config: dict) -> list[RadarPoint]:
-    """Build radar points from a report's stored scores + dimension names in config."""
-    names = {d["id"]: d.get("name", d["id"]) for d in (config or {}).get("dimensions", [])}
-    return [
-        RadarPoint(dimension=dim_id, score=float(score), label=names.get(dim_id, dim_id))
-        for dim_id, score in (scores or {}).items()
-    ]
+    return to_report_out(report), assessment_id
+
+
+def report_payload(scored: ScoringResult, assessment_version: int) -> dict:
+    """Report columns for a scoring result, including the derived display data."""
+    return {
+        "scores": scored.dimension_scores,
+        "overall_score": scored.overall_score,
+        "tier_result": scored.tier_result,
+        "recommendations": scored.recommendations,
+        "dimension_labels": scored.dimension_names,
+        "radar_data": [
+            {"dimension": dim_id, "score": score, "label": scored.dimension_names.get(dim_id, dim_id)}
+            for dim_id, score in scored.dimension_scores.items()
+        ],
+        "assessment_version": assessment_version,
+    }
+
+
+def maturity_summary(payload: dict, session_id: uuid.UUID, completed_at: datetime) -> dict:
+    """users.maturity_summary for a report written from `payload` (see `report_payload`)."""
+    return MaturitySummary(
+        overall_score=float(payload["overall_score"]),
+        tier_result=payload["tier_result"],
+        radar_data=payload["radar_data"],
+        as_of_session_id=session_id,
+        as_of_date=completed_at,
+    ).model_dump(mode="json")
+
+
+def _set_maturity_summary(db: AsyncSession, user_id: uuid.UUID, summary: dict, completed_at: datetime):
+    """UPDATE users.maturity_summary, unless it already describes a later completion."""
+    if db.bind.dialect.name == "sqlite":
+        as_of = func.julianday(func.json_extract(User.maturity_summary, "$.as_of_date"))
+        newer = as_of <= func.julianday(completed_at.isoformat())
+    else:
+        as_of = cast(User.maturity_summary["as_of_date"].astext, TIMESTAMP(timezone=True))
+        newer = as_of <= completed_at
+    return (
+        update(User)
+        .where(User.id == user_id, or_(as_of.is_(None), newer))
+        .values(maturity_summary=summary)
+    )
 
 
-async def get_previous_radar_data(
-    session: AssessmentSession, db: AsyncSession
-) -> list[RadarPoint] | None:
+def _previous_report(
+    user_id: uuid.UUID, assessment_id: uuid.UUID, session_id: uuid.UUID, completed_at: datetime
+):
     """
-    Radar data from the most recent completed session of the same assessment
-    by the same user, prior to the given session. None if no such report exists.
+    The report of the user's completed session of the same assessment that
+    comes last before this one in (completed_at, id) order: the overlay shown
+    next to a new report. Same order as the f4c7a9d2b581 backfill, so a
+    session completed in the same instant counts if its id is lower.
     """
-    if session.completed_at is None:
-        return None
-    prev = await db.scalar(
-        select(AssessmentSession)
+    return (
+        select(Report.id, Report.radar_data)
+        .join(AssessmentSession, Report.session_id == AssessmentSession.id)
         .where(
-            AssessmentSession.user_id == session.user_id,
-            AssessmentSession.assessment_id == session.assessment_id,
+            AssessmentSession.user_id == user_id,
+            AssessmentSession.assessment_id == assessment_id,
             AssessmentSession.status == SessionStatus.completed,
-            AssessmentSession.completed_at < session.completed_at,
-            AssessmentSession.id != session.id,
+            tuple_(AssessmentSession.completed_at, AssessmentSession.id) < tuple_(completed_at, session_id),
         )
-        .order_by(AssessmentSession.completed_at.desc())
+        .order_by(AssessmentSession.completed_at.desc(), AssessmentSession.id.desc())
         .limit(1)
     )
-    if not prev:
-        return None
-    report = await db.scalar(select(Report).where(Report.session_id == prev.id))
-    if not report:
-        return None
-    assessment = await db.get(Assessment, session.assessment_id)
-    return build_radar_data(report.scores, assessment.config if assessment else {})
-
-
-async def get_maturity_summary(user_id: uuid.UUID, db: AsyncSession) -> MaturitySummary | None:
-    """Summary of the user's most recent completed session's report, or None."""
-    row = (
-        await db.execute(
-            select(Report, AssessmentSession)
-            .join(AssessmentSession, Report.session_id == AssessmentSession.id)
-            .where(
-                AssessmentSession.user_id == user_id,
-                AssessmentSession.status == SessionStatus.completed,
-            )
-            .order_by(AssessmentSession.completed_at.desc())
-            .limit(1)
-        )
-    ).first()
-    if not row:
-        return None
-    report, session = row
-    assessment = await db.get(Assessment, session.assessment_id)
-    return MaturitySummary(
-        overall_score=float(report.overall_score),
-        tier_result=report.tier_result,
-        radar_data=build_radar_data(report.scores, assessment.config if assessment else {}),
-        as_of_session_id=session.id,
-        as_of_date=session.completed_at,
-    )
 
 
-def _to_report_out(report: Report, scored) -> ReportOut:
-    scores = report.scores or {}
-    recommendations = {}
-    radar_data = []
-
-    if isinstance(scored, ScoringResult):
-        recommendations = scored.recommendations
-        radar_data = [
-            RadarPoint(
-                dimension=dim_id,
-                score=score,
-                label=scored.dimension_names.get(dim_id, dim_id),
-            )
-            for dim_id, score in scores.items()
-        ]
-
+def to_report_out(report: Report) -> ReportOut:
+    """ReportOut straight from the stored row; nothing is re-scored."""
     return ReportOut(
         id=report.id,
         session_id=report.session_id,
-        scores=scores,
+        scores=report.scores or {},
         overall_score=float(report.overall_score),
         tier_result=report.tier_result,
-        recommendations=recommendations,
-        radar_data=radar_data,
+        recommendations=report.recommendations,
+        radar_data=report.radar_data,
+        previous_radar_data=report.previous_radar_data,
         pdf_url=report.pdf_url,
         generated_at=report.generated_at,
     )
@@ -168,27 +200,4 @@ async def get_report_out(session_id: uuid.UUID, db: AsyncSession) -> ReportOut |
     report = await db.scalar(
         select(Report).where(Report.session_id == session_id)
     )
-    if not report:
-        return None
-
-    session = await db.get(AssessmentSession, session_id)
-    assessment = await db.get(Assessment, session.assessment_id)
-
-    result = await db.execute(
-        select(Response).where(Response.session_id == session_id)
-    )
-    raw_responses = [
-        {
-            "question_id": r.question_id,
-            "dimension_id": r.dimension_id,
-            "answer_value": float(r.answer_value),
-        }
-        for r in result.scalars().all()
-    ]
-
-    scored: ScoringResult = score_responses(
-        responses=raw_responses,
-        config=assessment.config,
-        tier=session.tier_at_time.value,
-    )
-    return _to_report_out(report, scored)
+    return to_report_out(report) if report else None
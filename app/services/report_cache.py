@@ -0,0 +1,58 @@
+"""
+In-process cache of serialized GET /reports/{session_id} responses.
+
+A report never changes once written except for `pdf_url` (its
+previous-session overlay is stored with it), so the whole response body can
+be cached per session. Repeat views skip the
+database, pydantic and JSON encoding, and send a strong ETag so clients can
+revalidate for a 304. Whoever sets `pdf_url` calls `invalidate`; other
+replicas pick the URL up once their short-lived pending-PDF entry expires.
+"""
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import Gauge
+from app.schemas.schemas import ReportOut
+from app.utils.cache import TTLCache
+from app.utils.http import strong_etag
+
+
+@dataclass(frozen=True)
+class CachedReport:
+    owner_id: uuid.UUID  # so a cache hit can still be authorized without the database
+    body: bytes
+    etag: str
+
+
+_reports: TTLCache[CachedReport] = TTLCache(
+    maxsize=settings.REPORT_CACHE_MAX_SIZE,
+    ttl_seconds=settings.REPORT_CACHE_TTL_SECONDS,
+)
+
+Gauge("report_cache_size", "Serialized reports held in the report cache", lambda: len(_reports))
+
+
+def get(session_id: uuid.UUID) -> Optional[CachedReport]:
+    return _reports.get(session_id)
+
+
+def put(session_id: uuid.UUID, owner_id: uuid.UUID, report: ReportOut) -> CachedReport:
+    body = report.model_dump_json().encode()
+    entry = CachedReport(owner_id=owner_id, body=body, etag=strong_etag(body))
+    ttl = None if report.pdf_url else settings.REPORT_CACHE_PENDING_PDF_SECONDS
+    _reports.set(session_id, entry, ttl_seconds=ttl)
+    return entry
+
+
+def invalidate(session_id: uuid.UUID) -> None:
+    _reports.invalidate(session_id)
+
+
+def clear() -> None:
+    _reports.clear()
+
+
+def stats() -> dict:
+    return _reports.stats()
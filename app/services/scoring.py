@@ -3,7 +3,11 @@ Pure scoring functions — no DB access, no side effects.
 Input: responses list + assessment config dict + user tier.
 Output: ScoringResult with dimension scores, overall score, tier classification,
         radar data, and per-dimension recommendations.
+
+`compile_plan` does the config walk once per (config, tier); `score_plan`
+scores against the result. Callers cache plans (see assessment_summary).
 """
+from bisect import bisect_left
 from dataclasses import dataclass
 
 # Tier hierarchy used for question filtering
@@ -22,6 +26,70 @@ class ScoringResult:
     recommendations: dict   # {dimension_id: str}
 
 
+@dataclass(frozen=True)
+class ScoringPlan:
+    """
+    An assessment config compiled for one tier: the tier-eligible questions
+    flattened in config order, plus everything scoring reads from the config.
+    Build it once per (assessment, version, tier) with `compile_plan`.
+    """
+    dimension_ids: tuple[str, ...]
+    dimension_names: tuple[str, ...]
+    dimension_weights: tuple[float, ...]
+    # Per eligible question; `question_dims` indexes the dimension arrays.
+    question_ids: tuple[str, ...]
+    question_types: tuple[str, ...]
+    question_max_scores: tuple[float, ...]
+    question_choice_scores: tuple[dict, ...]  # multiple_choice options.scoring, else {}
+    question_dims: tuple[int, ...]
+    questions: tuple[dict, ...]               # the raw config entries, for listing
+    # (label, lo, hi) in config order; `threshold_highs` is set when the ranges
+    # ascend without overlap, so classification can bisect.
+    thresholds: tuple[tuple[str, float, float], ...]
+    threshold_highs: tuple[float, ...] | None
+    recommendations: dict                     # {dimension_id: {tier_result: text}}
+
+    @property
+    def question_count(self) -> int:
+        return len(self.question_ids)
+
+
+def compile_plan(config: dict, tier: str) -> ScoringPlan:
+    """Compile `config` for `tier`. Pure; callers cache the result."""
+    dims = config.get("dimensions", [])
+    rec_config = config.get("scoring", {}).get("recommendations", {})
+
+    questions: list[dict] = []
+    question_dims: list[int] = []
+    for index, dim in enumerate(dims):
+        eligible = _filter_questions_by_tier(dim.get("questions", []), tier)
+        questions.extend(eligible)
+        question_dims.extend([index] * len(eligible))
+
+    thresholds = tuple(
+        (label, lo, hi)
+        for label, (lo, hi) in config.get("scoring", {}).get("thresholds", _default_thresholds()).items()
+    )
+    ascending = all(lo <= hi for _, lo, hi in thresholds) and all(
+        prev[2] <= cur[1] for prev, cur in zip(thresholds, thresholds[1:])
+    )
+
+    return ScoringPlan(
+        dimension_ids=tuple(dim["id"] for dim in dims),
+        dimension_names=tuple(dim["name"] for dim in dims),
+        dimension_weights=tuple(float(dim.get("weight", 1.0)) for dim in dims),
+        question_ids=tuple(q["id"] for q in questions),
+        question_types=tuple(q.get("type", "scale") for q in questions),
+        question_max_scores=tuple(float(q.get("max_score", 5)) for q in questions),
+        question_choice_scores=tuple(_choice_scores(q) for q in questions),
+        question_dims=tuple(question_dims),
+        questions=tuple(questions),
+        thresholds=thresholds,
+        threshold_highs=tuple(hi for _, _, hi in thresholds) if ascending else None,
+        recommendations={dim["id"]: rec_config.get(dim["id"], {}) for dim in dims},
+    )
+
+
 def score_responses(responses: list[dict], config: dict, tier: str) -> ScoringResult:
     """
     Args:
@@ -31,34 +99,36 @@ def score_responses(responses: list[dict], config: dict, tier: str) -> ScoringRe
     Returns:
         ScoringResult
     """
+    return score_plan(responses, compile_plan(config, tier))
+
+
+def score_plan(responses: list[dict], plan: ScoringPlan) -> ScoringResult:
+    """`score_responses` against an already compiled plan."""
     response_map = {r["question_id"]: float(r["answer_value"]) for r in responses}
 
+    scored: list[list[float]] = [[] for _ in plan.dimension_ids]
+    for i, qid in enumerate(plan.question_ids):
+        raw = response_map.get(qid)
+        if raw is not None:
+            scored[plan.question_dims[i]].append(_score_answer(
+                raw, plan.question_types[i], plan.question_max_scores[i], plan.question_choice_scores[i],
+            ))
+
     dimension_scores = {}
     dimension_names = {}
     dimension_weights = {}
-
-    for dim in config.get("dimensions", []):
-        dim_id = dim["id"]
-        dimension_names[dim_id] = dim["name"]
-        dimension_weights[dim_id] = float(dim.get("weight", 1.0))
-
-        eligible_questions = _filter_questions_by_tier(dim.get("questions", []), tier)
-        if not eligible_questions:
-            dimension_scores[dim_id] = 0.0
-            continue
-
-        scored = []
-        for q in eligible_questions:
-            raw = response_map.get(q["id"])
-            if raw is not None:
-                scored.append(_score_question(raw, q))
-
-        dimension_scores[dim_id] = (sum(scored) / len(scored)) if scored else 0.0
+    for index, dim_id in enumerate(plan.dimension_ids):
+        dimension_names[dim_id] = plan.dimension_names[index]
+        dimension_weights[dim_id] = plan.dimension_weights[index]
+        dim_scores = scored[index]
+        dimension_scores[dim_id] = (sum(dim_scores) / len(dim_scores)) if dim_scores else 0.0
 
     overall = _weighted_average(dimension_scores, dimension_weights)
-    thresholds = config.get("scoring", {}).get("thresholds", _default_thresholds())
-    tier_result = _classify_tier(overall, thresholds)
-    recommendations = _pick_recommendations(dimension_scores, tier_result, config)
+    tier_result = _classify_tier(overall, plan)
+    recommendations = {
+        dim_id: plan.recommendations[dim_id].get(tier_result, "")
+        for dim_id in dimension_scores
+    }
 
     return ScoringResult(
         dimension_scores=dimension_scores,
@@ -71,10 +141,7 @@ def score_responses(responses: list[dict], config: dict, tier: str) -> ScoringRe
 
 def accessible_question_count(config: dict, tier: str) -> int:
     """Total number of questions accessible at this tier across all dimensions."""
-    return sum(
-        len(_filter_questions_by_tier(dim.get("questions", []), tier))
-        for dim in config.get("dimensions", [])
-    )
+    return compile_plan(config, tier).question_count
 
 
 def _filter_questions_by_tier(questions: list[dict], tier: str) -> list[dict]:
@@ -88,11 +155,15 @@ def _filter_questions_by_tier(questions: list[dict], tier: str) -> list[dict]:
     return eligible if limit is None else eligible[:limit]
 
 
-def _score_question(answer_value: float, question: dict) -> float:
-    """Normalise a single answer to 0–100."""
-    q_type = question.get("type", "scale")
-    max_score = float(question.get("max_score", 5))
+def _choice_scores(question: dict) -> dict:
+    if question.get("type", "scale") != "multiple_choice":
+        return {}
+    options = question.get("options", {})
+    return options.get("scoring", {}) if isinstance(options, dict) else {}
+
 
+def _score_answer(answer_value: float, q_type: str, max_score: float, choice_scores: dict) -> float:
+    """Normalise a single answer to 0–100."""
     if q_type == "scale":
         return min(max(answer_value / max_score * 100, 0), 100)
 
@@ -100,10 +171,7 @@ def _score_question(answer_value: float, question: dict) -> float:
         return 100.0 if answer_value else 0.0
 
     if q_type == "multiple_choice":
-        options = question.get("options", {})
-        scoring_map = options.get("scoring", {}) if isinstance(options, dict) else {}
-        key = str(int(answer_value))
-        raw = scoring_map.get(key, 0.5)
+        raw = choice_scores.get(str(int(answer_value)), 0.5)
         return float(raw) * 100
 
     # text: partial credit for non-empty (encoded as 1 = provided, 0 = skipped)
@@ -117,28 +185,27 @@ def _weighted_average(scores: dict, weights: dict) -> float:
     return sum(scores[k] * weights.get(k, 1.0) for k in scores) / total_weight
 
 
-def _classify_tier(overall_score: float, thresholds: dict) -> str:
+def _classify_tier(overall_score: float, plan: ScoringPlan) -> str:
     """
     thresholds: {"nascent": [0, 30], "developing": [30, 55], ...}
-    Returns the label whose range contains overall_score.
-    Fallback: "nascent".
+    Returns the first label, in config order, whose range contains
+    overall_score. Fallback: "nascent".
     """
-    for label, bounds in thresholds.items():
-        lo, hi = bounds
+    if plan.threshold_highs is not None:
+        # Ascending, non-overlapping ranges: only the first range ending at or
+        # above the score can contain it.
+        index = bisect_left(plan.threshold_highs, overall_score)
+        if index < len(plan.thresholds):
+            label, lo, _ = plan.thresholds[index]
+            if lo <= overall_score:
+                return label
+        return "nascent"
+    for label, lo, hi in plan.thresholds:
         if lo <= overall_score <= hi:
             return label
     return "nascent"
 
 
-def _pick_recommendations(dimension_scores: dict, tier_result: str, config: dict) -> dict:
-    """Pull recommendation text from config.scoring.recommendations[dim_id][tier_result]."""
-    rec_config = config.get("scoring", {}).get("recommendations", {})
-    return {
-        dim_id: rec_config.get(dim_id, {}).get(tier_result, "")
-        for dim_id in dimension_scores
-    }
-
-
 def _default_thresholds() -> dict:
     return {
         "nascent": [0, 30],
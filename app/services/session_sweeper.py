@@ -0,0 +1,172 @@
+"""
+Background job that marks idle in-progress sessions as abandoned.
+
+A session is idle once it was started, and last answered, longer than
+SESSION_IDLE_ABANDON_HOURS ago. Every SESSION_SWEEP_INTERVAL_SECONDS each
+worker runs a sweep: short transactions that each abandon at most
+SESSION_SWEEP_BATCH_SIZE sessions, so no run holds row locks for long.
+
+Only one replica sweeps at a time. Each batch transaction first takes a
+transaction-scoped Postgres advisory lock (pg_try_advisory_xact_lock); a
+worker that can't get it stops its run, as another one is already sweeping.
+Session-level advisory locks would leak across clients behind the Supabase
+transaction pooler, hence one lock per transaction.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import exists, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.metrics import Counter
+from app.models.models import AssessmentSession, Response, SessionStatus
+
+logger = logging.getLogger(__name__)
+
+SESSIONS_SWEPT = Counter(
+    "sessions_swept_total", "Idle in-progress sessions marked abandoned by the sweeper",
+)
+
+# Arbitrary, but fixed: every replica must contend for the same key.
+_ADVISORY_LOCK_KEY = 7_212_004_173
+
+# UPDATE by ctid so each batch is a TID scan over rows picked (and locked,
+# skipping any a request holds) by the inner SELECT.
+_PG_SWEEP_BATCH = text(
+    """
+    UPDATE assessment_sessions
+    SET status = 'abandoned'
+    WHERE ctid = ANY(ARRAY(
+        SELECT s.ctid FROM assessment_sessions s
+        WHERE s.status = 'in_progress'
+          AND s.started_at < :cutoff
+          AND NOT EXISTS (
+              SELECT 1 FROM responses r
+              WHERE r.session_id = s.id AND r.answered_at >= :cutoff
+          )
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    ))
+    AND status = 'in_progress'
+    """
+)
+
+
+class SessionSweeper:
+    def __init__(
+        self,
+        enabled: bool,
+        interval_seconds: float,
+        idle_after: timedelta,
+        batch_size: int,
+        session_maker=async_session_maker,
+    ):
+        self.enabled = enabled
+        self.interval_seconds = interval_seconds
+        self.idle_after = idle_after
+        self.batch_size = batch_size
+        self.session_maker = session_maker
+        self._task: Optional[asyncio.Task] = None
+        self.last_run_at: Optional[datetime] = None
+        self.last_swept: Optional[int] = None
+
+    async def sweep(self) -> Optional[int]:
+        """
+        Abandon idle sessions in batches. Returns how many were abandoned, or
+        None if another worker holds the sweep lock.
+        """
+        cutoff = datetime.now(timezone.utc) - self.idle_after
+        start = time.perf_counter()
+        swept = batches = 0
+        while True:
+            async with self.session_maker() as db:
+                touched = await self._sweep_batch(db, cutoff)
+                await db.commit()
+            if touched is None:
+                if batches == 0:
+                    logger.debug("session sweep skipped: another worker holds the lock")
+                    return None
+                break
+            swept += touched
+            batches += 1
+            if touched < self.batch_size:
+                break
+
+        SESSIONS_SWEPT.inc(swept)
+        self.last_run_at = datetime.now(timezone.utc)
+        self.last_swept = swept
+        logger.info(
+            "session sweep abandoned %d idle sessions in %d batches (%.0fms)",
+            swept, batches, (time.perf_counter() - start) * 1000,
+        )
+        return swept
+
+    async def _sweep_batch(self, db: AsyncSession, cutoff: datetime) -> Optional[int]:
+        if db.bind.dialect.name == "sqlite":
+            # No ctid, advisory locks or SKIP LOCKED; one process anyway.
+            idle = (
+                select(AssessmentSession.id)
+                .where(
+                    AssessmentSession.status == SessionStatus.in_progress,
+                    AssessmentSession.started_at < cutoff,
+                    ~exists().where(
+                        Response.session_id == AssessmentSession.id,
+                        Response.answered_at >= cutoff,
+                    ),
+                )
+                .limit(self.batch_size)
+            )
+            result = await db.execute(
+                update(AssessmentSession)
+                .where(AssessmentSession.id.in_(idle))
+                .values(status=SessionStatus.abandoned)
+            )
+            return result.rowcount
+
+        if not await db.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY}):
+            return None
+        result = await db.execute(_PG_SWEEP_BATCH, {"cutoff": cutoff, "batch_size": self.batch_size})
+        return result.rowcount
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("session sweep failed; will retry")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "idle_after_hours": self.idle_after.total_seconds() / 3600,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_swept": self.last_swept,
+            "total_swept": int(SESSIONS_SWEPT.value()),
+        }
+
+
+session_sweeper = SessionSweeper(
+    enabled=settings.SESSION_SWEEP_ENABLED,
+    interval_seconds=settings.SESSION_SWEEP_INTERVAL_SECONDS,
+    idle_after=timedelta(hours=settings.SESSION_IDLE_ABANDON_HOURS),
+    batch_size=settings.SESSION_SWEEP_BATCH_SIZE,
+)
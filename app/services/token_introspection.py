@@ -0,0 +1,136 @@
+"""
+Remote verification of Supabase access tokens via `GET /auth/v1/user`.
+
+Used for tokens that can't be checked locally (see token_verifier) and for
+checks only Supabase can answer, such as revoked sessions. The call is
+non-blocking and runs on one pooled HTTP client:
+
+- at most AUTH_INTROSPECTION_CONCURRENCY calls are in flight at once;
+- concurrent checks of the same token share one call (singleflight). The SPA
+  fires several parallel requests with the same bearer token on page load;
+- tokens Supabase rejected are remembered for AUTH_NEGATIVE_CACHE_SECONDS, so
+  a client retrying a dead token doesn't reach Supabase every time.
+
+An unreachable or failing Supabase raises IntrospectionUnavailable, not
+TokenRejected: an outage says nothing about the token.
+"""
+import asyncio
+import hashlib
+import logging
+import uuid
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services.token_verifier import TokenIdentity, TokenRejected
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger("redelk.auth")
+
+
+class IntrospectionUnavailable(Exception):
+    """Supabase could not be asked (network error, timeout, 5xx or 429)."""
+
+
+class TokenIntrospector:
+    def __init__(self, max_concurrency: int, negative_ttl_seconds: float, timeout_seconds: float):
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._rejected: TTLCache[bool] = TTLCache(maxsize=10_000, ttl_seconds=negative_ttl_seconds)
+        self.calls = 0
+        self.coalesced = 0
+
+    async def introspect(self, token: str) -> TokenIdentity:
+        key = hashlib.sha256(token.encode()).hexdigest()
+        if self._rejected.get(key):
+            raise TokenRejected("token recently rejected by Supabase")
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, token))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+        # Shield so one caller disconnecting doesn't cancel the call for the others.
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: str, token: str) -> TokenIdentity:
+        if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_ROLE_KEY:
+            raise RuntimeError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
+
+        async with self._semaphore:
+            self.calls += 1
+            try:
+                resp = await self._get_client().get(
+                    f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/user",
+                    headers={
+                        "Authorization": f"Bearer {token}",
+                        "apikey": settings.SUPABASE_SERVICE_ROLE_KEY,
+                    },
+                )
+            except httpx.HTTPError as exc:
+                # Transient — don't remember it as a rejection.
+                logger.warning("Supabase token introspection failed: %s", exc)
+                raise IntrospectionUnavailable(str(exc)) from exc
+
+        if resp.status_code in (401, 403):
+            self._rejected.set(key, True)
+            raise TokenRejected("token rejected by Supabase")
+        if resp.status_code >= 500 or resp.status_code == 429:
+            logger.warning("Supabase token introspection returned %d", resp.status_code)
+            raise IntrospectionUnavailable(f"introspection returned {resp.status_code}")
+        if resp.status_code != 200:
+            logger.warning("Supabase token introspection returned %d", resp.status_code)
+            raise TokenRejected(f"introspection returned {resp.status_code}")
+
+        data = resp.json()
+        try:
+            return TokenIdentity(user_id=uuid.UUID(str(data["id"])), email=data["email"])
+        except (KeyError, ValueError) as exc:
+            raise TokenRejected("unexpected introspection payload") from exc
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout_seconds,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "max_concurrency": self.max_concurrency,
+            "rejected_cache": self._rejected.stats(),
+        }
+
+
+introspector = TokenIntrospector(
+    max_concurrency=settings.AUTH_INTROSPECTION_CONCURRENCY,
+    negative_ttl_seconds=settings.AUTH_NEGATIVE_CACHE_SECONDS,
+    timeout_seconds=settings.AUTH_INTROSPECTION_TIMEOUT_SECONDS,
+)
+
+
+async def introspect(token: str) -> TokenIdentity:
+    return await introspector.introspect(token)
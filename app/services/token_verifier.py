@@ -0,0 +1,178 @@
+"""
+Local verification of Supabase access tokens.
+
+Supabase access tokens are JWTs signed either with the project's JWT secret
+(HS256, legacy projects) or with an asymmetric signing key published at
+`<SUPABASE_URL>/auth/v1/.well-known/jwks.json` (RS256 / ES256). Both can be
+checked in-process, which turns auth into a CPU-only operation instead of an
+HTTP round trip to Supabase on every request.
+
+`verify_locally()` either returns the caller's identity, raises
+`TokenRejected` (the token is definitely bad — expired, forged, wrong
+audience), or raises `CannotVerifyLocally` (we have no key material for it —
+the caller should fall back to asking Supabase).
+"""
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+import jwt
+
+from app.core.config import settings
+
+logger = logging.getLogger("redelk.auth")
+
+_SYMMETRIC_ALGS = ("HS256",)
+_ASYMMETRIC_ALGS = ("RS256", "ES256")
+
+# Don't hammer the JWKS endpoint when a client keeps presenting a token with
+# an unknown `kid` — at most one forced refresh per this many seconds.
+_MIN_FORCED_REFRESH_SECONDS = 30
+
+
+class TokenRejected(Exception):
+    """The token was checked locally and is invalid."""
+
+
+class CannotVerifyLocally(Exception):
+    """No local key material can check this token; ask Supabase instead."""
+
+
+@dataclass(frozen=True)
+class TokenIdentity:
+    user_id: uuid.UUID
+    email: str
+
+
+class JWKSCache:
+    """Signing keys from the Supabase JWKS endpoint, refreshed in the background.
+
+    Lookups never block on the network once keys are loaded: a stale cache
+    keeps serving its current keys while a refresh task runs. Only a cold
+    cache or an unknown `kid` (key rotation) awaits a fetch.
+    """
+
+    def __init__(self, url: str, ttl_seconds: float):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at: float = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def get_key(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        if not self._fetched_at:
+            await self.refresh()
+        elif time.monotonic() - self._fetched_at > self.ttl_seconds:
+            self._schedule_refresh()
+
+        key = self._keys.get(kid) if kid else None
+        if key is None and time.monotonic() - self._fetched_at > _MIN_FORCED_REFRESH_SECONDS:
+            # Possibly a freshly rotated key — fetch once before giving up.
+            await self.refresh()
+            key = self._keys.get(kid) if kid else None
+        return key
+
+    async def refresh(self) -> None:
+        seen = self._fetched_at
+        async with self._lock:
+            if self._fetched_at != seen:
+                # Another caller refreshed while this one waited for the lock.
+                return
+            try:
+                async with httpx.AsyncClient(timeout=5.0) as client:
+                    resp = await client.get(self.url)
+                    resp.raise_for_status()
+                    jwks = resp.json()
+            except Exception:
+                # Keep serving the keys we have; retry after the forced-refresh window.
+                logger.warning("JWKS refresh from %s failed", self.url, exc_info=True)
+                self._fetched_at = time.monotonic()
+                return
+
+            keys: dict[str, jwt.PyJWK] = {}
+            for data in jwks.get("keys", []):
+                try:
+                    key = jwt.PyJWK(data)
+                except jwt.PyJWTError:
+                    continue
+                if key.key_id:
+                    keys[key.key_id] = key
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+
+_jwks: Optional[JWKSCache] = None
+
+
+def _get_jwks() -> Optional[JWKSCache]:
+    global _jwks
+    if not settings.SUPABASE_URL:
+        return None
+    if _jwks is None:
+        _jwks = JWKSCache(
+            f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json",
+            ttl_seconds=settings.JWKS_REFRESH_SECONDS,
+        )
+    return _jwks
+
+
+async def verify_locally(token: str) -> TokenIdentity:
+    """Check signature and claims (exp, aud, sub, email) without calling Supabase."""
+    if settings.AUTH_VERIFY_MODE != "local":
+        raise CannotVerifyLocally("local verification disabled")
+    if not settings.SUPABASE_JWT_SECRET and not settings.SUPABASE_URL:
+        raise CannotVerifyLocally("no JWT secret or JWKS configured")
+
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError as exc:
+        raise TokenRejected("malformed token") from exc
+
+    alg = header.get("alg")
+    if alg in _SYMMETRIC_ALGS:
+        if not settings.SUPABASE_JWT_SECRET:
+            raise CannotVerifyLocally("no JWT secret configured")
+        key = settings.SUPABASE_JWT_SECRET
+    elif alg in _ASYMMETRIC_ALGS:
+        jwks = _get_jwks()
+        jwk = await jwks.get_key(header.get("kid")) if jwks else None
+        if jwk is None:
+            raise CannotVerifyLocally(f"no signing key for kid={header.get('kid')}")
+        key = jwk.key
+    else:
+        raise CannotVerifyLocally(f"unsupported alg {alg}")
+
+    decode_kwargs = {}
+    if settings.SUPABASE_URL:
+        decode_kwargs["issuer"] = f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1"
+    try:
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[alg],
+            audience=settings.SUPABASE_JWT_AUDIENCE,
+            leeway=settings.JWT_LEEWAY_SECONDS,
+            options={"require": ["exp", "aud", "sub"]},
+            **decode_kwargs,
+        )
+    except jwt.PyJWTError as exc:
+        raise TokenRejected(str(exc)) from exc
+
+    email = claims.get("email")
+    if not email:
+        raise TokenRejected("token has no email claim")
+    try:
+        user_id = uuid.UUID(str(claims["sub"]))
+    except ValueError as exc:
+        raise TokenRejected("sub is not a UUID") from exc
+
+    return TokenIdentity(user_id=user_id, email=email)
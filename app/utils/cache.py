@@ -0,0 +1,68 @@
+"""Small in-process caches shared by the services and routers."""
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+_MISSING: Any = object()
+
+
+class TTLCache(Generic[V]):
+    """Bounded LRU cache whose entries also expire after `ttl_seconds`.
+
+    Not thread-safe — meant to be used from the event loop only. Keeps hit /
+    miss / eviction counters so cache sizes can be tuned from real traffic.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V, ttl_seconds: Optional[float] = None) -> None:
+        """Store `value`; `ttl_seconds` overrides the cache-wide TTL for this entry."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
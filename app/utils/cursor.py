@@ -0,0 +1,22 @@
+"""Opaque pagination cursors: a few string fields, base64url-encoded."""
+import base64
+import binascii
+
+_SEP = "|"
+
+
+def encode_cursor(*fields: object) -> str:
+    raw = _SEP.join(str(f) for f in fields).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, n_fields: int) -> list[str]:
+    """Split a cursor back into its fields. Raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError) as exc:
+        raise ValueError("malformed cursor") from exc
+    fields = raw.split(_SEP)
+    if len(fields) != n_fields:
+        raise ValueError("malformed cursor")
+    return fields
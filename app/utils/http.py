@@ -0,0 +1,18 @@
+"""Conditional-request helpers (ETag / If-None-Match)."""
+import hashlib
+from typing import Optional
+
+
+def strong_etag(body: bytes) -> str:
+    """A strong validator for an exact response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header names `etag` (weak comparison, per RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
@@ -0,0 +1,84 @@
+"""
+One-off backfill of users.maturity_summary from each user's latest completed
+session's report. Session submit keeps the column current afterwards.
+
+Usage:
+
+    DATABASE_URL=postgresql://... python -m scripts.backfill_maturity_summary [--batch-size 500] [--dry-run]
+
+Safe to re-run: every user with a completed report is set to the same value
+submit would have written. Users without one are left alone.
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import bindparam, select, update
+
+from app.core.database import async_session_maker, engine
+from app.models.models import AssessmentSession, Report, SessionStatus, User
+from app.services.report_builder import maturity_summary
+
+
+def _latest_reports():
+    """One row per user: the report of their most recently completed session."""
+    return (
+        select(
+            AssessmentSession.user_id,
+            AssessmentSession.id.label("session_id"),
+            AssessmentSession.completed_at,
+            Report.overall_score,
+            Report.tier_result,
+            Report.radar_data,
+        )
+        .join(Report, Report.session_id == AssessmentSession.id)
+        .where(
+            AssessmentSession.status == SessionStatus.completed,
+            AssessmentSession.completed_at.is_not(None),
+        )
+        .distinct(AssessmentSession.user_id)
+        .order_by(AssessmentSession.user_id, AssessmentSession.completed_at.desc())
+    )
+
+
+async def main(batch_size: int, dry_run: bool) -> None:
+    stmt = (
+        update(User.__table__)
+        .where(User.__table__.c.id == bindparam("user_id"))
+        .values(maturity_summary=bindparam("summary"))
+    )
+    updated = 0
+    try:
+        async with async_session_maker() as db:
+            rows = (await db.execute(_latest_reports())).all()
+            for start in range(0, len(rows), batch_size):
+                batch = [
+                    {
+                        "user_id": row.user_id,
+                        "summary": maturity_summary(
+                            {
+                                "overall_score": row.overall_score,
+                                "tier_result": row.tier_result,
+                                "radar_data": row.radar_data,
+                            },
+                            row.session_id,
+                            row.completed_at,
+                        ),
+                    }
+                    for row in rows[start:start + batch_size]
+                ]
+                if not dry_run:
+                    await db.execute(stmt, batch)
+                    await db.commit()
+                updated += len(batch)
+    finally:
+        await engine.dispose()
+
+    print(f"{'would update' if dry_run else 'updated'} maturity_summary for {updated} users")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="count users without writing")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.dry_run))
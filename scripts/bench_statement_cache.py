@@ -0,0 +1,96 @@
+"""
+Per-query latency with the statement caches (asyncpg's and SQLAlchemy's) off
+("pooler" mode) vs on ("direct" mode), for the statements on the answer and
+report paths.
+
+Usage — point it at a direct (non-pgbouncer) connection:
+
+    DIRECT_URL=postgresql://... python -m scripts.bench_statement_cache --iterations 500
+
+Read-only: the statements look up random ids, so Postgres still parses and
+plans them in full but no rows are touched. Safe against any database that
+has the app schema.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.database import engine_options
+from app.models.models import Assessment, AssessmentSession, Report, Response, SessionStatus
+
+
+def _statements() -> dict:
+    session_id, user_id, assessment_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    return {
+        # answer path
+        "answer: owned session": select(AssessmentSession).where(AssessmentSession.id == session_id),
+        "answer: existing response": select(Response).where(
+            Response.session_id == session_id, Response.question_id == "q1"
+        ),
+        # report path
+        "report: report row": select(Report).where(Report.session_id == session_id),
+        "report: assessment": select(Assessment).where(Assessment.id == assessment_id),
+        "report: responses": select(Response).where(Response.session_id == session_id),
+        "report: previous session": (
+            select(AssessmentSession)
+            .where(
+                AssessmentSession.user_id == user_id,
+                AssessmentSession.assessment_id == assessment_id,
+                AssessmentSession.status == SessionStatus.completed,
+            )
+            .order_by(AssessmentSession.completed_at.desc())
+            .limit(1)
+        ),
+    }
+
+
+async def _bench(mode: str, url: str, iterations: int) -> dict[str, list[float]]:
+    async_url, connect_args = engine_options(url, mode)
+    engine = create_async_engine(async_url, pool_size=1, max_overflow=0, connect_args=connect_args)
+    timings: dict[str, list[float]] = {name: [] for name in _statements()}
+    try:
+        async with engine.connect() as conn:
+            for _ in range(iterations):
+                for name, stmt in _statements().items():
+                    start = time.perf_counter()
+                    await conn.execute(stmt)
+                    timings[name].append((time.perf_counter() - start) * 1000)
+    finally:
+        await engine.dispose()
+    return timings
+
+
+def _summary(samples: list[float]) -> tuple[float, float, float]:
+    ordered = sorted(samples)
+    return statistics.fmean(ordered), ordered[len(ordered) // 2], ordered[int(len(ordered) * 0.95)]
+
+
+async def main(iterations: int) -> None:
+    url = settings.DIRECT_URL or settings.DATABASE_URL
+    if not url:
+        raise SystemExit("Set DIRECT_URL (or DATABASE_URL) to a direct Postgres connection")
+
+    results = {mode: await _bench(mode, url, iterations) for mode in ("pooler", "direct")}
+
+    print(f"{iterations} iterations per statement, times in ms (mean / p50 / p95)\n")
+    print(f"{'statement':<28} {'pooler (no cache)':>22} {'direct (cached)':>22} {'saved/query':>12}")
+    for name in _statements():
+        pooler = _summary(results["pooler"][name])
+        direct = _summary(results["direct"][name])
+        print(
+            f"{name:<28} {pooler[0]:6.3f} /{pooler[1]:6.3f} /{pooler[2]:6.3f}"
+            f"  {direct[0]:6.3f} /{direct[1]:6.3f} /{direct[2]:6.3f}"
+            f"  {pooler[0] - direct[0]:10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    asyncio.run(main(parser.parse_args().iterations))
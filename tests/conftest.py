@@ -5,18 +5,26 @@ overrides, and a sample assessment config.
 The models use PostgreSQL-specific column types (JSONB, UUID); the @compiles
 hooks below map them to SQLite-compatible DDL so the schema can be created
 in-memory for tests.
+
+The PostgreSQL-only paths (data-modifying CTEs, row and advisory locks,
+`xmax`) are tested through the `pg_*` fixtures against the server in
+TEST_DATABASE_URL, one throwaway schema per test; without it those tests skip.
 """
+import os
 import uuid
+from contextlib import contextmanager
 from unittest.mock import AsyncMock
 
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
 from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.pool import StaticPool
 
+from app.core.query_stats import track_queries
 from app.models.models import Assessment, Base, TierEnum, User
 
 
@@ -90,16 +98,14 @@ async def db(session_maker):
         yield session
 
 
-@pytest_asyncio.fixture
-async def user(db) -> User:
+async def _add_user(db) -> User:
     u = User(id=uuid.uuid4(), email="test@example.com", tier=TierEnum.free, role="user")
     db.add(u)
     await db.commit()
     return u
 
 
-@pytest_asyncio.fixture
-async def assessment(db, config) -> Assessment:
+async def _add_assessment(db, config) -> Assessment:
     a = Assessment(
         id=uuid.uuid4(),
         slug="test-assessment",
@@ -114,6 +120,58 @@ async def assessment(db, config) -> Assessment:
     return a
 
 
+@pytest_asyncio.fixture
+async def user(db) -> User:
+    return await _add_user(db)
+
+
+@pytest_asyncio.fixture
+async def assessment(db, config) -> Assessment:
+    return await _add_assessment(db, config)
+
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+
+
+@pytest_asyncio.fixture
+async def pg_session_maker():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set")
+    from app.core.database import engine_options
+
+    url, _ = engine_options(TEST_DATABASE_URL, "direct")
+    schema = f"test_{uuid.uuid4().hex}"
+    admin = create_async_engine(url)
+    async with admin.begin() as conn:
+        await conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+    eng = create_async_engine(url, connect_args={"server_settings": {"search_path": schema}})
+    try:
+        async with eng.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        yield async_sessionmaker(eng, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        await eng.dispose()
+        async with admin.begin() as conn:
+            await conn.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+        await admin.dispose()
+
+
+@pytest_asyncio.fixture
+async def pg_db(pg_session_maker):
+    async with pg_session_maker() as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def pg_user(pg_db) -> User:
+    return await _add_user(pg_db)
+
+
+@pytest_asyncio.fixture
+async def pg_assessment(pg_db, config) -> Assessment:
+    return await _add_assessment(pg_db, config)
+
+
 @pytest.fixture
 def mock_pdf(monkeypatch) -> AsyncMock:
     """Replace the real WeasyPrint/Cloudinary pipeline with a stub URL."""
@@ -125,7 +183,7 @@ def mock_pdf(monkeypatch) -> AsyncMock:
 @pytest_asyncio.fixture
 async def client(db, user, session_maker, monkeypatch, mock_pdf):
     from app.core.database import get_db
-    from app.dependencies import get_current_user
+    from app.dependencies import get_current_user, get_read_db
     from app.main import app
     import app.routers.sessions as sessions_router
 
@@ -139,6 +197,7 @@ async def client(db, user, session_maker, monkeypatch, mock_pdf):
         return user
 
     app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_read_db] = _override_get_db
     app.dependency_overrides[get_current_user] = _override_user
     try:
         transport = ASGITransport(app=app)
@@ -146,3 +205,23 @@ async def client(db, user, session_maker, monkeypatch, mock_pdf):
             yield c
     finally:
         app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def max_statements(db, user):
+    """Assert the block runs at most `limit` SQL statements.
+
+    Clears the shared test session's identity map first (keeping the
+    authenticated user attached, as the identity cache does) so lookups that
+    would hit the database in a fresh per-request session are counted.
+    """
+    @contextmanager
+    def check(limit: int):
+        db.expunge_all()
+        db.add(user)
+        with track_queries() as stats:
+            yield stats
+        ran = "\n".join(f"  {n}x {sql}" for sql, n in stats.statements.items())
+        assert stats.count <= limit, f"{stats.count} statements, budget {limit}:\n{ran}"
+
+    return check
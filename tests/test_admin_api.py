@@ -0,0 +1,43 @@
+"""API tests for admin user management and the metrics endpoint."""
+import uuid
+
+import pytest_asyncio
+
+from app.dependencies import user_cache
+from app.models.models import TierEnum, User
+
+
+@pytest_asyncio.fixture
+async def admin(db, user) -> User:
+    user.role = "admin"
+    await db.commit()
+    return user
+
+
+@pytest_asyncio.fixture
+async def other_user(db) -> User:
+    u = User(id=uuid.uuid4(), email="other@example.com", tier=TierEnum.free, role="user")
+    db.add(u)
+    await db.commit()
+    return u
+
+
+async def test_tier_change_invalidates_identity_cache(client, admin, other_user):
+    user_cache.set(other_user.id, other_user)
+    resp = await client.patch(f"/admin/users/{other_user.id}/tier", json={"tier": "premium"})
+    assert resp.status_code == 200
+    assert resp.json()["tier"] == "premium"
+    assert user_cache.get(other_user.id) is None
+
+
+async def test_role_change_invalidates_identity_cache(client, admin, other_user):
+    user_cache.set(other_user.id, other_user)
+    resp = await client.patch(f"/admin/users/{other_user.id}/role", json={"role": "admin"})
+    assert resp.status_code == 200
+    assert user_cache.get(other_user.id) is None
+
+
+async def test_metrics_reports_identity_cache(client, admin):
+    resp = await client.get("/admin/metrics")
+    assert resp.status_code == 200
+    assert {"hits", "misses", "size"} <= resp.json()["identity_cache"].keys()
@@ -0,0 +1,186 @@
+"""Tests for the write-behind answer buffer (ANSWER_WRITE_BEHIND)."""
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+import app.routers.sessions as sessions_router
+from app.models.models import AssessmentSession, Report, Response, SessionStatus
+from app.schemas.schemas import AnswerIn
+from app.services.answer_buffer import AnswerBuffer
+from tests.test_sessions_api import _answer, _start, _submit
+
+
+@pytest.fixture
+def buffer(monkeypatch, session_maker) -> AnswerBuffer:
+    buf = AnswerBuffer(enabled=True, flush_interval_seconds=60, session_maker=session_maker)
+    monkeypatch.setattr(sessions_router, "answer_buffer", buf)
+    return buf
+
+
+async def _stored(db, session_id) -> dict[str, float]:
+    rows = (await db.execute(select(Response).where(Response.session_id == session_id))).scalars()
+    return {r.question_id: float(r.answer_value) for r in rows}
+
+
+async def test_first_answer_written_then_buffered(client, db, assessment, buffer):
+    session_id = uuid.UUID(await _start(client))
+    await _answer(client, session_id, [("s1", "strategy", 1)])  # verifies the session
+    await _answer(client, session_id, [("s1", "strategy", 2), ("s2", "strategy", 4)])
+    await _answer(client, session_id, [("s1", "strategy", 5)])
+
+    assert await _stored(db, session_id) == {"s1": 1}
+    assert buffer.pending_count() == 2
+
+    answers = (await client.get(f"/sessions/{session_id}/answers")).json()
+    assert {a["question_id"]: a["answer_value"] for a in answers} == {"s1": 5, "s2": 4}
+
+
+async def test_timer_flush_writes_latest_values(client, db, assessment, buffer):
+    session_id = uuid.UUID(await _start(client))
+    await _answer(client, session_id, [("s1", "strategy", 1)])
+    await _answer(client, session_id, [("s1", "strategy", 3), ("d1", "data", 2)])
+
+    await buffer.flush()
+    db.expire_all()
+    assert await _stored(db, session_id) == {"s1": 3, "d1": 2}
+    assert buffer.pending_count() == 0
+
+
+async def test_submit_flushes_before_scoring(client, db, assessment, buffer):
+    session_id = uuid.UUID(await _start(client))
+    await _answer(client, session_id, [("s1", "strategy", 1)])
+    await _answer(client, session_id, [("s1", "strategy", 5), ("s2", "strategy", 5),
+                                       ("d1", "data", 5), ("d2", "data", 5)])
+    await _submit(client, session_id)
+
+    report = await db.scalar(select(Report).where(Report.session_id == session_id))
+    assert float(report.overall_score) == 100.0
+    assert buffer.pending_count() == 0
+    assert buffer._open.get(session_id) is None
+
+
+@pytest.mark.parametrize("close", ["submit", "abandon"])
+async def test_failed_close_keeps_buffered_answers(client, db, user, assessment, buffer, close):
+    from app.dependencies import get_current_user
+    from app.main import app
+    from app.models.models import TierEnum, User
+
+    session_id = uuid.UUID(await _start(client))
+    await _answer(client, session_id, [("s1", "strategy", 1)])
+    await _answer(client, session_id, [("s1", "strategy", 5), ("s2", "strategy", 4)])
+
+    other = User(id=uuid.uuid4(), email="other@example.com", tier=TierEnum.free, role="user")
+    db.add(other)
+    await db.commit()
+    await db.refresh(other)
+
+    async def _other_user():
+        return other
+
+    owner_override = app.dependency_overrides[get_current_user]
+    app.dependency_overrides[get_current_user] = _other_user
+    if close == "submit":
+        resp = await client.post(f"/sessions/{session_id}/submit")
+    else:
+        resp = await client.patch(f"/sessions/{session_id}/abandon")
+    assert resp.status_code == 403
+    app.dependency_overrides[get_current_user] = owner_override
+
+    # The failed request's transaction is discarded, as get_db does.
+    await db.rollback()
+    await db.refresh(user)
+    assert await _stored(db, session_id) == {"s1": 1}
+    assert buffer.pending_count() == 2
+
+    await _submit(client, session_id)
+    db.expire_all()
+    assert await _stored(db, session_id) == {"s1": 5, "s2": 4}
+    assert buffer.pending_count() == 0
+
+
+async def test_answer_during_close_is_not_acknowledged(client, db, user, assessment, buffer):
+    """An answer racing a submit/abandon gets a 409 rather than a buffered ack."""
+    user_id = user.id
+    session_id = uuid.UUID(await _start(client))
+    await _answer(client, session_id, [("s1", "strategy", 1)])
+    await _answer(client, session_id, [("s2", "strategy", 4)])
+
+    async with buffer.closing(session_id, user_id, db):
+        assert not buffer.accepts(session_id, user_id)
+        session = await db.get(AssessmentSession, session_id)
+        session.status = SessionStatus.abandoned
+        await db.flush()
+        # The guarded write waits for the close's row lock on PostgreSQL, then
+        # sees the new status.
+        with pytest.raises(HTTPException) as exc_info:
+            await sessions_router._write_answers(
+                session_id, [AnswerIn(question_id="d1", dimension_id="data", answer_value=3)], user, db,
+            )
+        assert exc_info.value.status_code == 409
+        # A guarded write that got in before the close can't reopen the session.
+        buffer.open(session_id, user_id)
+        await db.commit()
+
+    assert not buffer.accepts(session_id, user_id)
+    assert buffer.pending_count() == 0
+    db.expire_all()
+    assert await _stored(db, session_id) == {"s1": 1, "s2": 4}
+
+
+async def test_close_rolled_back_restores_buffer(client, db, user, assessment, buffer):
+    user_id = user.id
+    session_id = uuid.UUID(await _start(client))
+    await _answer(client, session_id, [("s1", "strategy", 1)])
+    await _answer(client, session_id, [("s1", "strategy", 5), ("s2", "strategy", 4)])
+
+    with pytest.raises(RuntimeError):
+        async with buffer.closing(session_id, user_id, db):
+            assert buffer.buffered(session_id)  # still visible to reads meanwhile
+            raise RuntimeError("commit failed")
+    await db.rollback()
+
+    assert buffer.accepts(session_id, user_id)
+    assert {a.question_id: a.answer_value for a in buffer.buffered(session_id)} == {"s1": 5, "s2": 4}
+    assert await _stored(db, session_id) == {"s1": 1}
+
+
+async def test_abandon_stops_buffering(client, assessment, buffer):
+    session_id = uuid.UUID(await _start(client))
+    await _answer(client, session_id, [("s1", "strategy", 1)])
+    assert (await client.patch(f"/sessions/{session_id}/abandon")).status_code == 200
+
+    resp = await client.post(
+        f"/sessions/{session_id}/answer",
+        json={"question_id": "s1", "dimension_id": "strategy", "answer_value": 2},
+    )
+    assert resp.status_code == 409
+
+
+async def test_answers_for_closed_session_are_dropped(client, db, assessment, buffer, user):
+    user_id = user.id
+    session_id = uuid.UUID(await _start(client))
+    await _answer(client, session_id, [("s1", "strategy", 1)])
+    await _answer(client, session_id, [("s1", "strategy", 4)])
+
+    # Closed by another worker while this process still has it open.
+    session = await db.get(AssessmentSession, session_id)
+    session.status = SessionStatus.abandoned
+    await db.commit()
+
+    await buffer.flush()
+    db.expire_all()
+    assert await _stored(db, session_id) == {"s1": 1}
+    assert not buffer.accepts(session_id, user_id)
+
+
+async def test_stop_flushes_remaining(client, db, assessment, buffer):
+    session_id = uuid.UUID(await _start(client))
+    await _answer(client, session_id, [("s1", "strategy", 1)])
+    await _answer(client, session_id, [("s1", "strategy", 2)])
+
+    buffer.start()
+    await buffer.stop()
+    db.expire_all()
+    assert await _stored(db, session_id) == {"s1": 2}
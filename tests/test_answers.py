@@ -0,0 +1,87 @@
+"""PostgreSQL tests for write_answers: the guarded one-statement upsert."""
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+import app.routers.sessions as sessions_router
+from app.models.models import AssessmentSession, SessionStatus, TierEnum, User
+from app.schemas.schemas import AnswerIn
+from app.services.answers import write_answers
+
+
+def _answers(*items) -> list[AnswerIn]:
+    return [AnswerIn(question_id=q, dimension_id=d, answer_value=v) for q, d, v in items]
+
+
+async def _session(db, user, assessment, status=SessionStatus.in_progress) -> AssessmentSession:
+    session = AssessmentSession(
+        id=uuid.uuid4(), user_id=user.id, assessment_id=assessment.id,
+        status=status, tier_at_time=TierEnum.free,
+    )
+    db.add(session)
+    await db.commit()
+    return session
+
+
+async def _answered_count(db, session_id) -> int:
+    session = await db.get(AssessmentSession, session_id, populate_existing=True)
+    return session.answered_count
+
+
+async def test_inserted_and_updated_rows(pg_db, pg_user, pg_assessment):
+    session = await _session(pg_db, pg_user, pg_assessment)
+
+    first = await write_answers(session.id, pg_user.id, _answers(("s1", "strategy", 1), ("s2", "strategy", 2)), pg_db)
+    await pg_db.commit()
+    assert first == (pg_user.id, SessionStatus.in_progress, 2)
+    assert await _answered_count(pg_db, session.id) == 2
+
+    # s1 is updated, d1 inserted: both saved, only d1 counts as newly answered.
+    second = await write_answers(session.id, pg_user.id, _answers(("s1", "strategy", 5), ("d1", "data", 3)), pg_db)
+    await pg_db.commit()
+    assert second.saved == 2
+    assert await _answered_count(pg_db, session.id) == 3
+
+
+async def test_resent_answer_does_not_move_answered_count(pg_db, pg_user, pg_assessment):
+    session = await _session(pg_db, pg_user, pg_assessment)
+    for _ in range(3):
+        result = await write_answers(session.id, pg_user.id, _answers(("s1", "strategy", 4)), pg_db)
+        await pg_db.commit()
+        assert result.saved == 1
+    assert await _answered_count(pg_db, session.id) == 1
+
+
+async def test_not_owner_is_403_and_writes_nothing(pg_db, pg_user, pg_assessment):
+    session = await _session(pg_db, pg_user, pg_assessment)
+    other = User(id=uuid.uuid4(), email="other@example.com", tier=TierEnum.free, role="user")
+    pg_db.add(other)
+    await pg_db.commit()
+
+    result = await write_answers(session.id, other.id, _answers(("s1", "strategy", 4)), pg_db)
+    assert result == (pg_user.id, SessionStatus.in_progress, 0)
+    with pytest.raises(HTTPException) as exc_info:
+        await sessions_router._write_answers(session.id, _answers(("s1", "strategy", 4)), other, pg_db)
+    assert exc_info.value.status_code == 403
+    session_id = session.id
+    await pg_db.rollback()
+    assert await _answered_count(pg_db, session_id) == 0
+
+
+async def test_closed_session_is_409_and_writes_nothing(pg_db, pg_user, pg_assessment):
+    session = await _session(pg_db, pg_user, pg_assessment, status=SessionStatus.completed)
+
+    result = await write_answers(session.id, pg_user.id, _answers(("s1", "strategy", 4)), pg_db)
+    assert result == (pg_user.id, SessionStatus.completed, 0)
+    with pytest.raises(HTTPException) as exc_info:
+        await sessions_router._write_answers(session.id, _answers(("s1", "strategy", 4)), pg_user, pg_db)
+    assert exc_info.value.status_code == 409
+    session_id = session.id
+    await pg_db.rollback()
+    assert await _answered_count(pg_db, session_id) == 0
+
+
+async def test_unknown_session(pg_db, pg_user):
+    result = await write_answers(uuid.uuid4(), pg_user.id, _answers(("s1", "strategy", 4)), pg_db)
+    assert result == (None, None, 0)
@@ -1,5 +1,6 @@
 """API tests for GET /auth/me maturity_summary."""
 import pytest
+from sqlalchemy.orm.attributes import set_committed_value
 
 from tests.test_sessions_api import FREE_ANSWERS, _answer, _start, _submit
 
@@ -12,10 +13,12 @@ async def test_me_summary_null_without_sessions(client):
     assert body["maturity_summary"] is None
 
 
-async def test_me_summary_from_latest_completed(client, assessment):
+async def test_me_summary_from_latest_completed(client, db, user, assessment):
     session_id = await _start(client)
     await _answer(client, session_id, FREE_ANSWERS)
     await _submit(client, session_id)
+    # The client fixture hands back this instance rather than re-reading the row.
+    await db.refresh(user)
 
     resp = await client.get("/auth/me")
     summary = resp.json()["maturity_summary"]
@@ -30,3 +33,32 @@ async def test_me_summary_ignores_in_progress(client, assessment):
     await _start(client)  # never submitted
     resp = await client.get("/auth/me")
     assert resp.json()["maturity_summary"] is None
+
+
+async def test_me_summary_not_served_from_stale_user(client, db, user, assessment):
+    """A cached users row from before the submit still gets the new summary."""
+    session_id = await _start(client)
+    await _answer(client, session_id, FREE_ANSWERS)
+    await _submit(client, session_id)
+    # What another instance's identity cache would still hold.
+    await db.refresh(user)
+    set_committed_value(user, "maturity_summary", None)
+
+    for resp in (await client.get("/auth/me"), await client.patch("/auth/me", json={})):
+        assert resp.status_code == 200
+        assert resp.json()["maturity_summary"]["as_of_session_id"] == session_id
+
+
+async def test_me_reads_from_replica(client, db):
+    from app.dependencies import get_read_db
+    from app.main import app
+
+    used = []
+
+    async def _replica():
+        used.append(True)
+        yield db
+
+    app.dependency_overrides[get_read_db] = _replica
+    assert (await client.get("/auth/me")).status_code == 200
+    assert used
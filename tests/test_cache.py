@@ -0,0 +1,47 @@
+"""Unit tests for the in-process TTL/LRU cache."""
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache
+
+
+def test_lru_eviction_order():
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")        # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl_seconds=5)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    now[0] += 6
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl_seconds=60)
+    cache.set("short", 1, ttl_seconds=5)
+    cache.set("long", 2)
+    now[0] += 6
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+
+
+def test_stats_counts_hits_and_misses():
+    cache = TTLCache(maxsize=10, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
@@ -0,0 +1,70 @@
+"""Unit tests for engine configuration helpers in app/core/database.py."""
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.database import DB_POOL_WAIT_SECONDS, TimedQueuePool, engine_options, pool_stats, warm_pool
+
+
+def test_pooler_mode_disables_statement_cache():
+    url, connect_args = engine_options("postgresql://u:p@pooler/db", "pooler", "postgresql://u:p@direct/db")
+    assert url == "postgresql+asyncpg://u:p@pooler/db"
+    assert connect_args == {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+
+
+def test_direct_mode_uses_direct_url_with_cache():
+    url, connect_args = engine_options("postgresql://u:p@pooler/db", "direct", "postgresql://u:p@direct/db")
+    assert url == "postgresql+asyncpg://u:p@direct/db"
+    assert connect_args["statement_cache_size"] > 0
+    assert connect_args["prepared_statement_cache_size"] > 0
+
+
+def test_direct_mode_without_direct_url_keeps_url():
+    url, _ = engine_options("postgresql://u:p@replica/db", "direct")
+    assert url == "postgresql+asyncpg://u:p@replica/db"
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        engine_options("postgresql://u:p@h/db", "bogus")
+
+
+# ── pool warmup and stats ────────────────────────────────────────────────────
+
+@pytest_asyncio.fixture
+async def pooled_engine(tmp_path):
+    eng = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=3,
+        max_overflow=1,
+        pool_logging_name="test-pool",
+    )
+    yield eng
+    await eng.dispose()
+
+
+async def test_warm_pool_opens_pool_size_connections(pooled_engine):
+    assert await warm_pool(pooled_engine, 3) == 3
+    assert pooled_engine.pool.checkedin() == 3
+    assert pooled_engine.pool.checkedout() == 0
+
+
+async def test_pool_stats_report_checkouts_and_wait(pooled_engine):
+    before = DB_POOL_WAIT_SECONDS.count(pool="test-pool")
+    async with pooled_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        stats = pool_stats(pooled_engine)
+        assert stats["checked_out"] == 1
+    assert stats["pool"] == "test-pool"
+    assert stats["checkouts"] == before + 1
+    assert stats["avg_wait_ms"] is not None
+
+
+async def test_warm_pool_failure_is_not_raised():
+    eng = create_async_engine(
+        "sqlite+aiosqlite:////nonexistent-dir/x.db", poolclass=TimedQueuePool, pool_size=2,
+    )
+    assert await warm_pool(eng, 2) == 0
+    await eng.dispose()
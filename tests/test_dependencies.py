@@ -1,31 +1,43 @@
 """Unit tests for get_current_user in app/dependencies.py."""
+import asyncio
+import time
 import uuid
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import jwt
 import pytest
 from fastapi import HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
-from sqlalchemy.exc import IntegrityError
 
-from app.dependencies import get_current_user
+import app.dependencies as deps
+from app.dependencies import (
+    AUTH_PHASE_SECONDS,
+    AUTH_USER_CREATES,
+    AUTH_USER_LOOKUPS,
+    get_current_user,
+    invalidate_user,
+    pin_reads_to_primary,
+    user_cache,
+)
 from app.models.models import TierEnum, User
+from app.services import token_verifier
+from app.services.token_introspection import IntrospectionUnavailable
+from app.services.token_verifier import TokenIdentity, TokenRejected
 
 
-def _make_credentials(token: str = "tok") -> HTTPAuthorizationCredentials:
-    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+def _make_request() -> MagicMock:
+    return MagicMock()
 
 
-def _make_sb_user(uid: uuid.UUID, email: str = "user@example.com") -> MagicMock:
-    sb_user = MagicMock()
-    sb_user.id = str(uid)
-    sb_user.email = email
-    return sb_user
+def _make_credentials(token: str = "tok") -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
 
 
-def _make_sb_response(sb_user) -> MagicMock:
-    resp = MagicMock()
-    resp.user = sb_user
-    return resp
+def _remote(uid: uuid.UUID = None, email: str = "user@example.com", **kwargs):
+    """Patch the Supabase introspection call (used for tokens we can't verify locally)."""
+    if uid is not None:
+        kwargs["return_value"] = TokenIdentity(user_id=uid, email=email)
+    return patch("app.dependencies.token_introspection.introspect", new=AsyncMock(**kwargs))
 
 
 def _make_db(get_return=None) -> AsyncMock:
@@ -41,6 +53,13 @@ def _make_db(get_return=None) -> AsyncMock:
 USER_ID = uuid.uuid4()
 
 
+@pytest.fixture(autouse=True)
+def _clear_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
 # ── happy paths ──────────────────────────────────────────────────────────────
 
 @pytest.mark.asyncio
@@ -48,11 +67,8 @@ async def test_existing_user_returned():
     """Supabase token valid, user already in DB → returned as-is."""
     existing = User(id=USER_ID, email="user@example.com", tier=TierEnum.free)
     db = _make_db(get_return=existing)
-    sb_user = _make_sb_user(USER_ID)
-
-    with patch("app.dependencies._get_supabase") as mock_sb:
-        mock_sb.return_value.auth.get_user.return_value = _make_sb_response(sb_user)
-        result = await get_current_user(_make_credentials(), db)
+    with _remote(USER_ID):
+        result = await get_current_user(_make_request(), _make_credentials(), db)
 
     assert result is existing
     db.add.assert_not_called()
@@ -61,109 +77,264 @@ async def test_existing_user_returned():
 
 @pytest.mark.asyncio
 async def test_new_user_created():
-    """User not in DB → row inserted, refreshed, and returned."""
+    """User not in DB → a single upsert statement creates and returns the row."""
+    created = User(id=USER_ID, email="user@example.com", tier=TierEnum.free)
     db = _make_db(get_return=None)
-    sb_user = _make_sb_user(USER_ID)
+    db.execute = AsyncMock(return_value=MagicMock(one=MagicMock(return_value=(created, True))))
+    with _remote(USER_ID):
+        result = await get_current_user(_make_request(), _make_credentials(), db)
 
-    async def fake_refresh(obj):
-        obj.id = USER_ID
+    db.execute.assert_awaited_once()
+    db.commit.assert_awaited_once()
+    db.add.assert_not_called()
+    db.refresh.assert_not_called()
+    assert result is created
 
-    db.refresh = AsyncMock(side_effect=fake_refresh)
 
-    with patch("app.dependencies._get_supabase") as mock_sb:
-        mock_sb.return_value.auth.get_user.return_value = _make_sb_response(sb_user)
-        result = await get_current_user(_make_credentials(), db)
+@pytest.mark.asyncio
+async def test_first_login_inserts_row(db):
+    """Against a real database the upsert creates the row with free-tier defaults."""
+    with _remote(USER_ID, email="first@example.com"):
+        result = await get_current_user(_make_request(), _make_credentials(), db)
 
-    db.add.assert_called_once()
-    db.commit.assert_called_once()
-    db.refresh.assert_called_once()
-    assert isinstance(result, User)
+    assert result.id == USER_ID
     assert result.tier == TierEnum.free
+    assert result.role == "user"
+    assert result.created_at is not None
+    assert await db.get(User, USER_ID) is result
 
 
 # ── race condition ───────────────────────────────────────────────────────────
 
 @pytest.mark.asyncio
-async def test_race_condition_integrity_error():
-    """INSERT raises IntegrityError (concurrent request won) → rollback + re-fetch."""
-    existing = User(id=USER_ID, email="user@example.com", tier=TierEnum.free)
+async def test_race_condition_returns_winning_row(db, user):
+    """Row inserted by a concurrent request after our lookup → upsert returns it."""
+    user.company = "Winner Corp"
+    await db.commit()
+    with _remote(user.id, email=user.email), patch.object(db, "get", AsyncMock(return_value=None)):
+        result = await get_current_user(_make_request(), _make_credentials(), db)
 
-    db = _make_db(get_return=None)
-    db.commit = AsyncMock(side_effect=IntegrityError("", {}, Exception()))
-    # Second db.get (after rollback) returns the row that won the race
-    db.get = AsyncMock(side_effect=[None, existing])
+    assert result.id == user.id
+    assert result.company == "Winner Corp"
 
-    sb_user = _make_sb_user(USER_ID)
 
-    with patch("app.dependencies._get_supabase") as mock_sb:
-        mock_sb.return_value.auth.get_user.return_value = _make_sb_response(sb_user)
-        result = await get_current_user(_make_credentials(), db)
+@pytest.mark.asyncio
+async def test_concurrent_first_logins_create_once(pg_session_maker):
+    """Two first logins at once: one INSERT creates the row, the other sees xmax != 0."""
+    before = {outcome: AUTH_USER_CREATES.value(outcome=outcome) for outcome in ("inserted", "race")}
 
-    db.rollback.assert_called_once()
-    assert result is existing
+    async def first_login():
+        async with pg_session_maker() as db:
+            # Both requests missed the row in their lookup.
+            with patch.object(db, "get", AsyncMock(return_value=None)):
+                return (await get_current_user(_make_request(), _make_credentials(), db)).id
 
+    with _remote(USER_ID):
+        ids = await asyncio.gather(first_login(), first_login())
 
-@pytest.mark.asyncio
-async def test_race_condition_row_vanishes_raises_500():
-    """INSERT raises IntegrityError but re-fetch also returns None → 500."""
-    db = _make_db(get_return=None)
-    db.commit = AsyncMock(side_effect=IntegrityError("", {}, Exception()))
-    db.get = AsyncMock(return_value=None)
+    assert ids == [USER_ID, USER_ID]
+    assert AUTH_USER_CREATES.value(outcome="inserted") == before["inserted"] + 1
+    assert AUTH_USER_CREATES.value(outcome="race") == before["race"] + 1
+    async with pg_session_maker() as db:
+        assert await db.get(User, USER_ID) is not None
 
-    sb_user = _make_sb_user(USER_ID)
 
-    with patch("app.dependencies._get_supabase") as mock_sb:
-        mock_sb.return_value.auth.get_user.return_value = _make_sb_response(sb_user)
+@pytest.mark.asyncio
+async def test_email_conflict_raises_500(db, user):
+    """Email already owned by another id → rollback and 500, no partial row."""
+    other_id = uuid.uuid4()
+    with _remote(other_id, email=user.email):
         with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(_make_credentials(), db)
+            await get_current_user(_make_request(), _make_credentials(), db)
 
     assert exc_info.value.status_code == 500
+    assert await db.get(User, other_id) is None
 
 
 # ── auth failures ────────────────────────────────────────────────────────────
 
 @pytest.mark.asyncio
-async def test_none_response_raises_401():
-    """auth.get_user returns None → 401."""
+async def test_remote_rejection_raises_401():
+    """Supabase rejects the token → 401."""
     db = _make_db()
-    with patch("app.dependencies._get_supabase") as mock_sb:
-        mock_sb.return_value.auth.get_user.return_value = None
+    with _remote(side_effect=TokenRejected("token rejected by Supabase")):
         with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(_make_credentials(), db)
+            await get_current_user(_make_request(), _make_credentials(), db)
 
     assert exc_info.value.status_code == 401
 
 
 @pytest.mark.asyncio
-async def test_response_user_none_raises_401():
-    """auth.get_user returns a response but .user is None → 401."""
+async def test_introspection_outage_raises_503():
+    """Supabase unreachable or failing → 503, so clients retry instead of logging out."""
     db = _make_db()
-    resp = MagicMock()
-    resp.user = None
-    with patch("app.dependencies._get_supabase") as mock_sb:
-        mock_sb.return_value.auth.get_user.return_value = resp
+    with _remote(side_effect=IntrospectionUnavailable("introspection returned 502")):
         with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(_make_credentials(), db)
+            await get_current_user(_make_request(), _make_credentials(), db)
 
-    assert exc_info.value.status_code == 401
+    assert exc_info.value.status_code == 503
+    db.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_missing_config_raises_runtime_error():
+    """RuntimeError from missing SUPABASE_URL/KEY is re-raised, not swallowed."""
+    db = _make_db()
+    with _remote(side_effect=RuntimeError("missing config")):
+        with pytest.raises(RuntimeError, match="missing config"):
+            await get_current_user(_make_request(), _make_credentials(), db)
 
 
+# ── local verification ───────────────────────────────────────────────────────
+
 @pytest.mark.asyncio
-async def test_supabase_exception_raises_401():
-    """Supabase client throws (e.g. network error, invalid token) → 401."""
+async def test_locally_verified_token_skips_supabase(monkeypatch):
+    """A token signed with the project JWT secret never reaches Supabase."""
+    secret = "local-secret-for-dependency-tests"
+    monkeypatch.setattr(token_verifier.settings, "SUPABASE_JWT_SECRET", secret)
+    monkeypatch.setattr(token_verifier.settings, "SUPABASE_URL", "")
+    token = jwt.encode(
+        {"sub": str(USER_ID), "email": "user@example.com", "aud": "authenticated",
+         "exp": int(time.time()) + 60},
+        secret, algorithm="HS256",
+    )
+    existing = User(id=USER_ID, email="user@example.com", tier=TierEnum.free)
+    db = _make_db(get_return=existing)
+
+    with _remote() as remote:
+        result = await get_current_user(_make_request(), _make_credentials(token), db)
+        remote.assert_not_called()
+
+    assert result is existing
+
+
+@pytest.mark.asyncio
+async def test_locally_rejected_token_raises_401(monkeypatch):
+    """An expired token is rejected locally without a Supabase round trip."""
+    secret = "local-secret-for-dependency-tests"
+    monkeypatch.setattr(token_verifier.settings, "SUPABASE_JWT_SECRET", secret)
+    token = jwt.encode(
+        {"sub": str(USER_ID), "email": "user@example.com", "aud": "authenticated",
+         "exp": int(time.time()) - 60},
+        secret, algorithm="HS256",
+    )
     db = _make_db()
-    with patch("app.dependencies._get_supabase") as mock_sb:
-        mock_sb.return_value.auth.get_user.side_effect = Exception("network error")
+
+    with _remote() as remote:
         with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(_make_credentials(), db)
+            await get_current_user(_make_request(), _make_credentials(token), db)
+        remote.assert_not_called()
 
     assert exc_info.value.status_code == 401
 
 
+# ── identity cache ───────────────────────────────────────────────────────────
+
 @pytest.mark.asyncio
-async def test_missing_config_raises_runtime_error():
-    """RuntimeError from missing SUPABASE_URL/KEY is re-raised, not swallowed."""
+async def test_second_request_served_from_cache():
+    """Only the first request for a user touches the users table."""
+    existing = User(id=USER_ID, email="user@example.com", tier=TierEnum.free)
+    db = _make_db(get_return=existing)
+    with _remote(USER_ID):
+        await get_current_user(_make_request(), _make_credentials(), db)
+        await get_current_user(_make_request(), _make_credentials(), db)
+
+    db.get.assert_awaited_once()
+    db.merge.assert_awaited_once()
+    assert user_cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user_forces_reload():
+    existing = User(id=USER_ID, email="user@example.com", tier=TierEnum.free)
+    db = _make_db(get_return=existing)
+    with _remote(USER_ID):
+        await get_current_user(_make_request(), _make_credentials(), db)
+        invalidate_user(USER_ID)
+        await get_current_user(_make_request(), _make_credentials(), db)
+
+    assert db.get.await_count == 2
+    db.merge.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_cached_user_attaches_to_real_session(db, user):
+    """A cache hit yields a persistent instance of the request's session, no SELECT."""
+    with _remote(user.id, email=user.email):
+        first = await get_current_user(_make_request(), _make_credentials(), db)
+        second = await get_current_user(_make_request(), _make_credentials(), db)
+
+    assert second.id == user.id
+    assert second in db
+    assert user_cache.get(user.id) is not first  # cache holds its own snapshot
+
+
+# ── instrumentation ──────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_phase_timings_recorded():
+    """Each phase lands on request.state for the access log and in the histogram."""
+    existing = User(id=USER_ID, email="user@example.com", tier=TierEnum.free)
+    db = _make_db(get_return=existing)
+    request = _make_request()
+    before_verify = AUTH_PHASE_SECONDS.count(phase="verify")
+    before_cache = AUTH_USER_LOOKUPS.value(source="cache")
+
+    with _remote(USER_ID):
+        await get_current_user(request, _make_credentials(), db)
+        await get_current_user(_make_request(), _make_credentials(), db)
+
+    assert set(request.state.auth_timings) == {"verify", "lookup"}
+    assert AUTH_PHASE_SECONDS.count(phase="verify") == before_verify + 2
+    assert AUTH_USER_LOOKUPS.value(source="cache") == before_cache + 1
+
+
+@pytest.mark.asyncio
+async def test_rejected_token_still_reports_verify_time():
     db = _make_db()
-    with patch("app.dependencies._get_supabase", side_effect=RuntimeError("missing config")):
-        with pytest.raises(RuntimeError, match="missing config"):
-            await get_current_user(_make_credentials(), db)
+    request = _make_request()
+    with _remote(side_effect=TokenRejected("nope")):
+        with pytest.raises(HTTPException):
+            await get_current_user(request, _make_credentials(), db)
+    assert "verify" in request.state.auth_timings
+
+
+# ── read replica routing ─────────────────────────────────────────────────────
+
+def _fake_maker(label: str) -> MagicMock:
+    session = AsyncMock()
+    session.label = label
+    maker = MagicMock()
+    maker.return_value.__aenter__ = AsyncMock(return_value=session)
+    maker.return_value.__aexit__ = AsyncMock(return_value=False)
+    return maker
+
+
+async def _read_session(monkeypatch, user, headers=None):
+    monkeypatch.setattr(deps, "async_session_maker", _fake_maker("primary"))
+    monkeypatch.setattr(deps, "read_session_maker", _fake_maker("replica"))
+    request = MagicMock()
+    request.headers = headers or {}
+    gen = deps.get_read_db(request, user)
+    session = await gen.__anext__()
+    await gen.aclose()
+    return session.label
+
+
+@pytest.mark.asyncio
+async def test_read_db_uses_replica_by_default(monkeypatch):
+    user = User(id=uuid.uuid4(), email="r@example.com", tier=TierEnum.free)
+    assert await _read_session(monkeypatch, user) == "replica"
+
+
+@pytest.mark.asyncio
+async def test_read_db_pinned_to_primary_after_write(monkeypatch):
+    user = User(id=uuid.uuid4(), email="r@example.com", tier=TierEnum.free)
+    pin_reads_to_primary(user.id)
+    assert await _read_session(monkeypatch, user) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_read_db_consistency_header_forces_primary(monkeypatch):
+    user = User(id=uuid.uuid4(), email="r@example.com", tier=TierEnum.free)
+    assert await _read_session(monkeypatch, user, {"x-consistency": "primary"}) == "primary"
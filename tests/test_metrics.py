@@ -0,0 +1,39 @@
+"""Unit tests for the in-process metrics registry and the /metrics endpoint."""
+from app.core import metrics
+from app.core.metrics import Counter, Histogram
+
+
+def test_counter_renders_per_label_set():
+    c = Counter("test_things_total", "Things", ["kind"])
+    c.inc(kind="a")
+    c.inc(2, kind="b")
+    text = "\n".join(c.render())
+    assert '# TYPE test_things_total counter' in text
+    assert 'test_things_total{kind="a"} 1' in text
+    assert 'test_things_total{kind="b"} 2' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("test_latency_seconds", "Latency", ["phase"], buckets=(0.01, 0.1))
+    h.observe(0.005, phase="x")
+    h.observe(0.01, phase="x")   # le is inclusive
+    h.observe(0.5, phase="x")
+    lines = h.render()
+    assert 'test_latency_seconds_bucket{phase="x",le="0.01"} 2' in lines
+    assert 'test_latency_seconds_bucket{phase="x",le="0.1"} 2' in lines
+    assert 'test_latency_seconds_bucket{phase="x",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_count{phase="x"} 3' in lines
+    assert h.count(phase="x") == 3
+
+
+async def test_metrics_endpoint_requires_admin(client):
+    assert (await client.get("/metrics")).status_code == 403
+
+
+async def test_metrics_endpoint_exposes_auth_phases(client, user):
+    user.role = "admin"
+    resp = await client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert "# TYPE auth_phase_seconds histogram" in resp.text
+    assert metrics.render_prometheus().startswith("# HELP")
@@ -0,0 +1,101 @@
+"""Per-endpoint SQL statement budgets and the statement counting behind them."""
+import pytest
+from sqlalchemy import select, text
+
+import app.routers.assessments as assessments_router
+import app.routers.auth as auth_router
+import app.routers.reports as reports_router
+import app.routers.sessions as sessions_router
+from app.core.query_stats import QueryStats, budget_for, budget_warnings, statement_budget, track_queries
+from app.models.models import User
+from tests.test_reports_api import _complete_session
+from tests.test_sessions_api import FREE_ANSWERS, _answer, _start
+
+
+# ── counting ─────────────────────────────────────────────────────────────────
+
+async def test_statements_counted_in_nested_trackers(db, user):
+    with track_queries() as outer:
+        await db.execute(text("SELECT 1"))
+        with track_queries() as inner:
+            await db.execute(select(User))
+    assert outer.count == 2
+    assert inner.count == 1
+    assert outer.duration > 0
+
+
+async def test_nothing_counted_outside_a_tracker(db, user):
+    with track_queries() as stats:
+        pass
+    await db.execute(text("SELECT 1"))
+    assert stats.count == 0
+
+
+def test_budget_warnings():
+    @statement_budget(2)
+    async def endpoint():
+        pass
+
+    stats = QueryStats(count=3)
+    stats.statements["SELECT * FROM responses WHERE id = ?"] = 3
+    problems = budget_warnings(endpoint, stats)
+    assert problems[0] == "ran 3 SQL statements, budget is 2"
+    assert "possible N+1" in problems[1]
+    assert budget_warnings(endpoint, QueryStats(count=2)) == []
+
+
+# ── endpoint budgets ─────────────────────────────────────────────────────────
+
+async def test_get_report_within_budget(client, assessment, max_statements):
+    await _complete_session(client)
+    session_id = await _complete_session(client)  # has a previous report too
+    with max_statements(budget_for(reports_router.get_report)):
+        resp = await client.get(f"/reports/{session_id}")
+    assert resp.status_code == 200
+    assert resp.json()["previous_radar_data"] is not None
+
+
+async def test_session_lifecycle_within_budget(client, assessment, max_statements):
+    with max_statements(budget_for(sessions_router.start_session)):
+        session_id = await _start(client)
+    with max_statements(budget_for(sessions_router.answer_question)):
+        await _answer(client, session_id, FREE_ANSWERS[:1])
+    with max_statements(budget_for(sessions_router.get_session_answers)):
+        assert (await client.get(f"/sessions/{session_id}/answers")).status_code == 200
+    with max_statements(budget_for(sessions_router.bootstrap_session)):
+        assert (await client.get(f"/sessions/{session_id}/bootstrap")).status_code == 200
+    with max_statements(budget_for(sessions_router.list_sessions)):
+        assert (await client.get("/sessions")).status_code == 200
+    with max_statements(budget_for(sessions_router.submit_session)):
+        assert (await client.post(f"/sessions/{session_id}/submit")).status_code == 200
+
+
+async def test_abandon_within_budget(client, assessment, max_statements):
+    session_id = await _start(client)
+    with max_statements(budget_for(sessions_router.abandon_session)):
+        assert (await client.patch(f"/sessions/{session_id}/abandon")).status_code == 200
+
+
+@pytest.mark.parametrize("path, endpoint", [
+    ("/assessments", assessments_router.list_assessments),
+    ("/assessments/test-assessment", assessments_router.get_assessment),
+    ("/auth/me", auth_router.me),
+])
+async def test_read_endpoints_within_budget(client, assessment, max_statements, path, endpoint):
+    with max_statements(budget_for(endpoint)):
+        assert (await client.get(path)).status_code == 200
+
+
+async def test_update_me_within_budget(client, max_statements):
+    with max_statements(budget_for(auth_router.update_me)):
+        assert (await client.patch("/auth/me", json={"company": "Acme"})).status_code == 200
+
+
+async def test_over_budget_warns_in_development(client, assessment, monkeypatch, caplog):
+    import app.main as main
+
+    monkeypatch.setattr(main.settings, "ENVIRONMENT", "development")
+    monkeypatch.setattr(assessments_router.get_assessment, "__statement_budget__", 0)
+    with caplog.at_level("WARNING", logger="redelk.access"):
+        await client.get("/assessments/test-assessment")
+    assert "ran 1 SQL statements, budget is 0" in caplog.text
@@ -1,22 +1,23 @@
-"""Tests for report_builder: build_report, radar helpers, previous radar, maturity summary."""
+"""Tests for report_builder: complete_session, predecessor link, maturity summary."""
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from decimal import Decimal
 
 import pytest
 
 from app.models.models import AssessmentSession, Report, Response, SessionStatus, TierEnum
+from app.schemas.schemas import MaturitySummary
 from app.services import report_builder
 
 
-async def _make_completed_session(db, user, assessment, completed_at, answers=None):
+async def _complete(db, user, assessment, answers=None, session_id=None):
+    """An in-progress session with `answers`, completed through complete_session."""
     session = AssessmentSession(
-        id=uuid.uuid4(),
+        id=session_id or uuid.uuid4(),
         user_id=user.id,
         assessment_id=assessment.id,
-        status=SessionStatus.completed,
+        status=SessionStatus.in_progress,
         tier_at_time=TierEnum.free,
-        completed_at=completed_at,
     )
     db.add(session)
     for qid, dim, value in (answers or []):
@@ -25,20 +26,26 @@ async def _make_completed_session(db, user, assessment, completed_at, answers=No
             question_id=qid, dimension_id=dim, answer_value=Decimal(str(value)),
         ))
     await db.commit()
-    return session
+    out, _ = await report_builder.complete_session(session.id, user.id, db)
+    return session, out
 
 
 DEFAULT_ANSWERS = [("s1", "strategy", 5), ("s2", "strategy", 3),
                    ("d1", "data", 1), ("d2", "data", 2)]
 
 
-# ── build_report ─────────────────────────────────────────────────────────────
+@pytest.fixture(params=["sqlite", "postgresql"])
+def backend(request):
+    """(db, user, assessment) on each dialect; complete_session has one path per dialect."""
+    prefix = "pg_" if request.param == "postgresql" else ""
+    return tuple(request.getfixturevalue(prefix + name) for name in ("db", "user", "assessment"))
 
-async def test_build_report_persists_and_scores(db, user, assessment):
-    session = await _make_completed_session(
-        db, user, assessment, datetime(2026, 1, 1), DEFAULT_ANSWERS)
 
-    out = await report_builder.build_report(session.id, db)
+# ── complete_session ─────────────────────────────────────────────────────────
+
+async def test_complete_session_persists_and_scores(backend):
+    db, user, assessment = backend
+    session, out = await _complete(db, user, assessment, DEFAULT_ANSWERS)
 
     assert out.overall_score == pytest.approx(60.0)
     assert out.tier_result == "maturing"
@@ -47,107 +54,149 @@ async def test_build_report_persists_and_scores(db, user, assessment):
     assert labels["strategy"] == "Strategy & Vision"
     assert out.recommendations["strategy"] == "strategy-maturing"
 
-    # persisted
+    # persisted, with everything a read needs
     report = await db.get(Report, out.id)
     assert report is not None
     assert float(report.overall_score) == pytest.approx(60.0)
+    assert report.recommendations == out.recommendations
+    assert report.dimension_labels == {"strategy": "Strategy & Vision", "data": "Data & Infrastructure"}
+    assert report.assessment_version == assessment.version
+    assert report_builder.to_report_out(report) == out
+    await db.refresh(session)
+    assert session.status == SessionStatus.completed
 
 
-async def test_build_report_is_idempotent(db, user, assessment):
-    session = await _make_completed_session(
-        db, user, assessment, datetime(2026, 1, 1), DEFAULT_ANSWERS)
+async def test_complete_session_only_once(db, user, assessment):
+    session, first = await _complete(db, user, assessment, DEFAULT_ANSWERS)
 
-    first = await report_builder.build_report(session.id, db)
-    second = await report_builder.build_report(session.id, db)
-    assert first.id == second.id
-    assert second.overall_score == pytest.approx(60.0)
+    assert await report_builder.complete_session(session.id, user.id, db) is None
+    assert await report_builder.get_report_out(session.id, db) == first
 
 
-async def test_build_report_unknown_session_raises(db):
-    with pytest.raises(ValueError):
-        await report_builder.build_report(uuid.uuid4(), db)
+async def test_complete_session_unknown_or_not_owned(db, user, assessment):
+    assert await report_builder.complete_session(uuid.uuid4(), user.id, db) is None
 
+    session = AssessmentSession(
+        id=uuid.uuid4(), user_id=user.id, assessment_id=assessment.id,
+        status=SessionStatus.in_progress, tier_at_time=TierEnum.free,
+    )
+    db.add(session)
+    await db.commit()
+    assert await report_builder.complete_session(session.id, uuid.uuid4(), db) is None
 
-# ── build_radar_data ─────────────────────────────────────────────────────────
 
-def test_build_radar_data_labels_from_config(config):
-    radar = report_builder.build_radar_data({"strategy": 80.0, "unknown": 10.0}, config)
-    by_dim = {p.dimension: p for p in radar}
-    assert by_dim["strategy"].label == "Strategy & Vision"
-    assert by_dim["strategy"].score == 80.0
-    assert by_dim["unknown"].label == "unknown"  # fallback to id
+# ── predecessor link ─────────────────────────────────────────────────────────
 
+async def test_first_report_has_no_predecessor(db, user, assessment):
+    _, out = await _complete(db, user, assessment, DEFAULT_ANSWERS)
 
-def test_build_radar_data_handles_empty():
-    assert report_builder.build_radar_data({}, {}) == []
-    assert report_builder.build_radar_data(None, None) == []
+    assert out.previous_radar_data is None
+    assert (await db.get(Report, out.id)).previous_report_id is None
 
 
-# ── get_previous_radar_data ──────────────────────────────────────────────────
+async def test_report_records_prior_radar(db, user, assessment):
+    _, prior = await _complete(db, user, assessment, [("s1", "strategy", 5), ("s2", "strategy", 5)])
+    _, out = await _complete(db, user, assessment, DEFAULT_ANSWERS)
 
-async def test_previous_radar_none_without_prior(db, user, assessment):
-    session = await _make_completed_session(
-        db, user, assessment, datetime(2026, 1, 2), DEFAULT_ANSWERS)
-    await report_builder.build_report(session.id, db)
+    assert out.previous_radar_data is not None
+    by_dim = {p.dimension: p.score for p in out.previous_radar_data}
+    assert by_dim["strategy"] == pytest.approx(100.0)
+    assert (await db.get(Report, out.id)).previous_report_id == prior.id
 
-    assert await report_builder.get_previous_radar_data(session, db) is None
 
+async def test_report_links_most_recent_prior(db, user, assessment):
+    await _complete(db, user, assessment, [("s1", "strategy", 1), ("s2", "strategy", 1)])
+    _, middle = await _complete(db, user, assessment, [("s1", "strategy", 4), ("s2", "strategy", 4)])
+    _, out = await _complete(db, user, assessment, DEFAULT_ANSWERS)
 
-async def test_previous_radar_returns_prior_scores(db, user, assessment):
-    prior = await _make_completed_session(
-        db, user, assessment, datetime(2026, 1, 1),
-        [("s1", "strategy", 5), ("s2", "strategy", 5)])
-    await report_builder.build_report(prior.id, db)
+    by_dim = {p.dimension: p.score for p in out.previous_radar_data}
+    assert by_dim["strategy"] == pytest.approx(80.0)  # from `middle`, not the oldest
+    assert (await db.get(Report, out.id)).previous_report_id == middle.id
 
-    current = await _make_completed_session(
-        db, user, assessment, datetime(2026, 1, 2), DEFAULT_ANSWERS)
-    await report_builder.build_report(current.id, db)
 
-    radar = await report_builder.get_previous_radar_data(current, db)
-    assert radar is not None
-    by_dim = {p.dimension: p.score for p in radar}
-    assert by_dim["strategy"] == pytest.approx(100.0)
+async def test_report_predecessor_completed_same_instant(backend, monkeypatch):
+    """A session completed at the same moment with a lower id is the predecessor, as in the backfill."""
+    db, user, assessment = backend
+    instant = datetime(2026, 1, 1, tzinfo=timezone.utc)
 
+    class _Frozen(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return instant
 
-async def test_previous_radar_picks_most_recent_prior(db, user, assessment):
-    oldest = await _make_completed_session(
-        db, user, assessment, datetime(2026, 1, 1),
-        [("s1", "strategy", 1), ("s2", "strategy", 1)])
-    await report_builder.build_report(oldest.id, db)
+    monkeypatch.setattr(report_builder, "datetime", _Frozen)
+    _, first = await _complete(db, user, assessment, DEFAULT_ANSWERS, uuid.UUID(int=1))
+    _, second = await _complete(db, user, assessment, DEFAULT_ANSWERS, uuid.UUID(int=2))
 
-    middle = await _make_completed_session(
-        db, user, assessment, datetime(2026, 1, 5),
-        [("s1", "strategy", 4), ("s2", "strategy", 4)])
-    await report_builder.build_report(middle.id, db)
+    assert (await db.get(Report, first.id)).previous_report_id is None
+    assert (await db.get(Report, second.id)).previous_report_id == first.id
 
-    current = await _make_completed_session(
-        db, user, assessment, datetime(2026, 1, 10), DEFAULT_ANSWERS)
-    await report_builder.build_report(current.id, db)
 
-    radar = await report_builder.get_previous_radar_data(current, db)
-    by_dim = {p.dimension: p.score for p in radar}
-    assert by_dim["strategy"] == pytest.approx(80.0)  # from `middle`, not `oldest`
+@pytest.mark.parametrize("ids", [(1, 2), (2, 1)])
+async def test_report_predecessor_tie_broken_by_id(db, user, assessment, ids):
+    """Same completed_at: the higher session id wins, matching the backfill."""
+    done = {}
+    for n in ids:
+        done[n] = await _complete(db, user, assessment, DEFAULT_ANSWERS, uuid.UUID(int=n))
+    tied = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for session, _ in done.values():
+        session.completed_at = tied
+    await db.commit()
+    _, out = await _complete(db, user, assessment, DEFAULT_ANSWERS)
 
+    assert (await db.get(Report, out.id)).previous_report_id == done[2][1].id
 
-# ── get_maturity_summary ─────────────────────────────────────────────────────
 
-async def test_maturity_summary_none_without_completed_sessions(db, user):
-    assert await report_builder.get_maturity_summary(user.id, db) is None
+# ── users.maturity_summary ───────────────────────────────────────────────────
 
+async def test_maturity_summary_none_without_completed_sessions(db, user):
+    await db.refresh(user)
+    assert user.maturity_summary is None
 
-async def test_maturity_summary_uses_latest_completed(db, user, assessment):
-    old = await _make_completed_session(
-        db, user, assessment, datetime(2026, 1, 1),
-        [("s1", "strategy", 1), ("s2", "strategy", 1)])
-    await report_builder.build_report(old.id, db)
 
-    latest = await _make_completed_session(
-        db, user, assessment, datetime(2026, 2, 1), DEFAULT_ANSWERS)
-    await report_builder.build_report(latest.id, db)
+async def test_maturity_summary_uses_latest_completed(backend):
+    db, user, assessment = backend
+    await _complete(db, user, assessment, [("s1", "strategy", 1), ("s2", "strategy", 1)])
+    latest, _ = await _complete(db, user, assessment, DEFAULT_ANSWERS)
 
-    summary = await report_builder.get_maturity_summary(user.id, db)
-    assert summary is not None
+    await db.refresh(user)
+    summary = MaturitySummary.model_validate(user.maturity_summary)
     assert summary.overall_score == pytest.approx(60.0)
     assert summary.tier_result == "maturing"
     assert summary.as_of_session_id == latest.id
     assert {p.dimension for p in summary.radar_data} == {"strategy", "data"}
+
+
+async def test_maturity_summary_untouched_when_report_kept(backend):
+    """ON CONFLICT kept an existing report: the summary must not describe the unwritten one."""
+    db, user, assessment = backend
+    session = AssessmentSession(
+        id=uuid.uuid4(), user_id=user.id, assessment_id=assessment.id,
+        status=SessionStatus.in_progress, tier_at_time=TierEnum.free,
+    )
+    db.add(session)
+    db.add(Report(
+        id=uuid.uuid4(), session_id=session.id, scores={}, overall_score=0,
+        tier_result="nascent", assessment_version=assessment.version,
+    ))
+    await db.commit()
+
+    out, _ = await report_builder.complete_session(session.id, user.id, db)
+    assert out.tier_result == "nascent"
+    await db.refresh(user)
+    assert user.maturity_summary is None
+
+
+async def test_maturity_summary_keeps_later_completion(backend):
+    """A submit that commits last but completed first doesn't overwrite the newer summary."""
+    db, user, assessment = backend
+    newer = {
+        "overall_score": 90.0, "tier_result": "leading", "radar_data": [],
+        "as_of_session_id": str(uuid.uuid4()), "as_of_date": "2999-01-01T00:00:00Z",
+    }
+    user.maturity_summary = newer
+    await db.commit()
+
+    await _complete(db, user, assessment, DEFAULT_ANSWERS)
+    await db.refresh(user)
+    assert user.maturity_summary == newer
@@ -51,6 +51,37 @@ async def test_previous_radar_data_from_prior_session(client, assessment):
     assert resp.json()["previous_radar_data"] is None
 
 
+async def test_report_served_from_cache_with_etag(client, assessment, max_statements):
+    session_id = await _complete_session(client)
+    first = await client.get(f"/reports/{session_id}")
+    etag = first.headers["ETag"]
+
+    with max_statements(0):
+        again = await client.get(f"/reports/{session_id}")
+        assert again.content == first.content
+        resp = await client.get(f"/reports/{session_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+
+
+async def test_report_cache_invalidated_when_pdf_url_set(client, db, assessment, monkeypatch):
+    session_id = await _complete_session(client)
+    report = await db.scalar(select(Report).where(Report.session_id == uuid.UUID(session_id)))
+    report.pdf_url = None
+    await db.commit()
+
+    pending = await client.get(f"/reports/{session_id}")
+    assert pending.json()["pdf_url"] is None
+
+    monkeypatch.setattr("app.services.pdf.generate_and_upload_pdf",
+                        AsyncMock(return_value="https://res.cloudinary.test/on-demand.pdf"))
+    assert (await client.get(f"/reports/{session_id}/pdf")).status_code == 302
+
+    resp = await client.get(f"/reports/{session_id}", headers={"If-None-Match": pending.headers["ETag"]})
+    assert resp.status_code == 200
+    assert resp.json()["pdf_url"] == "https://res.cloudinary.test/on-demand.pdf"
+
+
 # ── PDF endpoint ─────────────────────────────────────────────────────────────
 
 async def test_pdf_404_without_report(client, assessment):
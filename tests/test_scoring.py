@@ -1,7 +1,10 @@
 """Unit tests for the pure scoring service."""
+import uuid
+
 import pytest
 
-from app.services.scoring import accessible_question_count, score_responses
+from app.services import assessment_summary
+from app.services.scoring import accessible_question_count, compile_plan, score_plan, score_responses
 
 
 def _resp(qid: str, dim: str, value: float) -> dict:
@@ -107,3 +110,47 @@ def test_recommendations_empty_when_missing_from_config(config):
     config["scoring"].pop("recommendations")
     result = score_responses([_resp("s1", "strategy", 5)], config, "free")
     assert result.recommendations == {"strategy": "", "data": ""}
+
+
+# ── compiled plans ───────────────────────────────────────────────────────────
+
+def test_plan_flattens_eligible_questions(config):
+    plan = compile_plan(config, "free")
+    assert plan.dimension_ids == ("strategy", "data")
+    assert plan.question_ids == ("s1", "s2", "d1", "d2")
+    assert plan.question_dims == (0, 0, 1, 1)
+    assert plan.question_count == accessible_question_count(config, "free")
+
+
+def test_plan_reused_across_responses(config):
+    plan = compile_plan(config, "free")
+    for value in (0, 1, 3, 5):
+        responses = [_resp("s1", "strategy", value), _resp("d1", "data", 5)]
+        assert score_plan(responses, plan) == score_responses(responses, config, "free")
+
+
+def test_scoring_plan_cached_per_version(config):
+    assessment_id = uuid.uuid4()
+    plan = assessment_summary.scoring_plan(assessment_id, 1, config, "free")
+    assert assessment_summary.scoring_plan(assessment_id, 1, config, "free") is plan
+    assert assessment_summary.scoring_plan(assessment_id, 1, config, "basic") is not plan
+    assert assessment_summary.scoring_plan(assessment_id, 2, config, "free") is not plan
+
+
+@pytest.mark.parametrize("thresholds, score, expected", [
+    # ascending ranges: shared bounds go to the earlier label, gaps fall back
+    ({"nascent": [0, 30], "developing": [30, 55], "leading": [55, 100]}, 30.0, "nascent"),
+    ({"nascent": [0, 30], "developing": [30, 55], "leading": [55, 100]}, 54.0, "developing"),
+    ({"developing": [10, 20], "leading": [40, 60]}, 30.0, "nascent"),
+    # not ascending: first match in config order
+    ({"leading": [50, 100], "developing": [0, 60]}, 55.0, "leading"),
+    ({"developing": [0, 60], "leading": [50, 100]}, 55.0, "developing"),
+])
+def test_classification_follows_config_order(config, thresholds, score, expected):
+    config["scoring"]["thresholds"] = thresholds
+    value = score / 100 * 5
+    responses = [_resp(q, d, value) for q, d in
+                 [("s1", "strategy"), ("s2", "strategy"), ("d1", "data"), ("d2", "data")]]
+    result = score_responses(responses, config, "free")
+    assert result.overall_score == pytest.approx(score)
+    assert result.tier_result == expected
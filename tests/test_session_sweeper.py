@@ -0,0 +1,89 @@
+"""Tests for the background sweep that abandons idle in-progress sessions."""
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.models.models import AssessmentSession, Response, SessionStatus, TierEnum
+from app.services.session_sweeper import SessionSweeper
+
+
+def _sweeper(session_maker) -> SessionSweeper:
+    return SessionSweeper(
+        enabled=True, interval_seconds=60, idle_after=timedelta(hours=24),
+        batch_size=2, session_maker=session_maker,
+    )
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def backend(request):
+    """(session_maker, db, user, assessment) on each dialect; the sweep has one path per dialect."""
+    prefix = "pg_" if request.param == "postgresql" else ""
+    return tuple(request.getfixturevalue(prefix + name) for name in ("session_maker", "db", "user", "assessment"))
+
+
+async def _idle_sessions(db, user, assessment, n: int) -> list[uuid.UUID]:
+    started_at = datetime.now(timezone.utc) - timedelta(days=3)
+    sessions = [
+        AssessmentSession(id=uuid.uuid4(), user_id=user.id, assessment_id=assessment.id,
+                          status=SessionStatus.in_progress, tier_at_time=TierEnum.free, started_at=started_at)
+        for _ in range(n)
+    ]
+    db.add_all(sessions)
+    await db.commit()
+    return [s.id for s in sessions]
+
+
+async def test_sweep_abandons_only_idle_sessions(backend):
+    session_maker, db, user, assessment = backend
+    sweeper = _sweeper(session_maker)
+    now = datetime.now(timezone.utc)
+    old = now - timedelta(days=3)
+
+    def session(started_at, status=SessionStatus.in_progress):
+        s = AssessmentSession(id=uuid.uuid4(), user_id=user.id, assessment_id=assessment.id,
+                              status=status, tier_at_time=TierEnum.free, started_at=started_at)
+        db.add(s)
+        return s
+
+    idle = [session(old) for _ in range(3)]
+    answered_recently = session(old)
+    fresh = session(now - timedelta(hours=1))
+    completed = session(old, SessionStatus.completed)
+    await db.flush()
+    db.add(Response(id=uuid.uuid4(), session_id=answered_recently.id, question_id="s1",
+                    dimension_id="strategy", answer_value=Decimal("3"), answered_at=now))
+    await db.commit()
+    idle_ids = [s.id for s in idle]
+    kept = {answered_recently.id: SessionStatus.in_progress, fresh.id: SessionStatus.in_progress,
+            completed.id: SessionStatus.completed}
+
+    assert await sweeper.sweep() == 3  # two batches of at most 2
+    assert sweeper.last_swept == 3
+
+    db.expire_all()
+    statuses = {sid: (await db.get(AssessmentSession, sid)).status for sid in [*idle_ids, *kept]}
+    assert {statuses[sid] for sid in idle_ids} == {SessionStatus.abandoned}
+    assert {sid: statuses[sid] for sid in kept} == kept
+
+    assert await sweeper.sweep() == 0
+
+
+async def test_sweep_lock_keeps_second_sweeper_out(pg_session_maker, pg_db, pg_user, pg_assessment):
+    """While one sweeper's batch transaction is open, another gets no batch at all."""
+    idle_ids = await _idle_sessions(pg_db, pg_user, pg_assessment, 5)
+    first, second = _sweeper(pg_session_maker), _sweeper(pg_session_maker)
+    cutoff = datetime.now(timezone.utc) - first.idle_after
+
+    async with pg_session_maker() as held:
+        assert await first._sweep_batch(held, cutoff) == 2
+        assert await second.sweep() is None
+        assert second.last_swept is None
+        await held.commit()
+
+    # Lock released with the transaction: the rest goes in two more batches.
+    assert await second.sweep() == 3
+    pg_db.expire_all()
+    statuses = {(await pg_db.get(AssessmentSession, sid)).status for sid in idle_ids}
+    assert statuses == {SessionStatus.abandoned}
@@ -0,0 +1,139 @@
+"""Tests for the /sessions/{id}/ws answer stream."""
+import asyncio
+import json
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import WebSocketDisconnect
+from sqlalchemy import select
+
+import app.routers.sessions as sessions_router
+from app.models.models import Response
+from tests.test_sessions_api import FREE_ANSWERS, _answer, _start, _submit
+
+
+class FakeWebSocket:
+    """Scripted client: queued messages, then a disconnect."""
+
+    def __init__(self, *messages):
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        for message in messages:
+            self.incoming.put_nowait(message if isinstance(message, str) else json.dumps(message))
+        self.incoming.put_nowait(None)
+        self.sent: list[dict] = []
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def receive_text(self) -> str:
+        await asyncio.sleep(0.005)  # let the server handle one message before the next
+        message = await self.incoming.get()
+        if message is None:
+            raise WebSocketDisconnect(1000)
+        return message
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+    async def close(self, code=1000, reason=None):
+        self.close_code = code
+
+
+AUTH = {"type": "auth", "token": "tok"}
+
+
+def _msg(qid, dim, value):
+    return {"question_id": qid, "dimension_id": dim, "answer_value": value}
+
+
+@pytest.fixture
+def authed(monkeypatch, user):
+    monkeypatch.setattr(sessions_router, "authenticate", AsyncMock(return_value=user))
+
+
+async def test_stream_writes_answers_and_reports_progress(client, db, assessment, authed):
+    session_id = uuid.UUID(await _start(client))
+    ws = FakeWebSocket(
+        AUTH,
+        _msg("s1", "strategy", 3),
+        [_msg("s2", "strategy", 4), _msg("d1", "data", 2)],
+        "not json",
+        _msg("s1", "strategy", 5),
+    )
+    await sessions_router.answer_stream(ws, session_id, db)
+
+    assert ws.close_code is None
+    assert ws.sent[0] == {"type": "ready", "answered": 0, "total": 4, "progress_pct": 0}
+    acks = [m for m in ws.sent if m["type"] == "ack"]
+    assert acks[-1]["answered"] == 3
+    assert acks[-1]["progress_pct"] == 75
+    assert [m["type"] for m in ws.sent].count("error") == 1
+
+    rows = (await db.execute(select(Response).where(Response.session_id == session_id))).scalars()
+    assert {r.question_id: float(r.answer_value) for r in rows} == {"s1": 5, "s2": 4, "d1": 2}
+
+
+async def test_list_message_with_invalid_item_saves_nothing(client, db, assessment, authed):
+    session_id = uuid.UUID(await _start(client))
+    ws = FakeWebSocket(
+        AUTH,
+        [_msg("s1", "strategy", 3), {"question_id": "s2"}, _msg("d1", "data", 2)],
+        _msg("s2", "strategy", 4),
+    )
+    await sessions_router.answer_stream(ws, session_id, db)
+
+    assert [m["type"] for m in ws.sent] == ["ready", "error", "ack"]
+    rows = (await db.execute(select(Response).where(Response.session_id == session_id))).scalars()
+    assert {r.question_id: float(r.answer_value) for r in rows} == {"s2": 4}
+
+
+async def test_ready_counts_existing_answers(client, db, assessment, authed):
+    session_id = uuid.UUID(await _start(client))
+    await _answer(client, session_id, FREE_ANSWERS[:2])
+    ws = FakeWebSocket(AUTH)
+    await sessions_router.answer_stream(ws, session_id, db)
+    assert ws.sent == [{"type": "ready", "answered": 2, "total": 4, "progress_pct": 50}]
+
+
+async def test_first_message_must_authenticate(client, db, assessment):
+    session_id = uuid.UUID(await _start(client))
+    ws = FakeWebSocket(_msg("s1", "strategy", 3))
+    await sessions_router.answer_stream(ws, session_id, db)
+    assert ws.close_code == 4401
+
+
+async def test_unknown_session_closes_4404(db, authed):
+    ws = FakeWebSocket(AUTH)
+    await sessions_router.answer_stream(ws, uuid.uuid4(), db)
+    assert ws.close_code == 4404
+
+
+async def test_submitted_session_closes_4409(client, db, assessment, authed):
+    session_id = uuid.UUID(await _start(client))
+    await _answer(client, session_id, FREE_ANSWERS)
+    await _submit(client, session_id)
+    ws = FakeWebSocket(AUTH)
+    await sessions_router.answer_stream(ws, session_id, db)
+    assert ws.close_code == 4409
+
+
+def test_route_closes_without_auth_message(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.core.database import get_db
+    from app.main import app
+
+    async def _unused_db():
+        yield None
+
+    monkeypatch.setattr(sessions_router, "WS_AUTH_TIMEOUT_SECONDS", 0.05)
+    app.dependency_overrides[get_db] = _unused_db
+    try:
+        with TestClient(app).websocket_connect(f"/sessions/{uuid.uuid4()}/ws") as ws:
+            with pytest.raises(WebSocketDisconnect) as exc:
+                ws.receive_text()
+        assert exc.value.code == 4401
+    finally:
+        app.dependency_overrides.pop(get_db)
@@ -1,9 +1,15 @@
 """API tests for the session lifecycle and the enriched GET /sessions payload."""
 import asyncio
+import copy
+import uuid
+from datetime import datetime, timedelta, timezone
 
 import pytest
+from sqlalchemy import func, select, update
 
 import app.routers.sessions as sessions_router
+from app.models.models import AssessmentSession, Report, Response, SessionStatus, TierEnum, User
+from app.utils.cursor import encode_cursor
 
 FREE_ANSWERS = [("s1", "strategy", 5), ("s2", "strategy", 3),
                 ("d1", "data", 1), ("d2", "data", 2)]
@@ -49,6 +55,23 @@ async def test_submit_twice_conflicts(client, assessment):
     assert resp.status_code == 409
 
 
+async def test_submit_keeps_existing_report(client, db, assessment):
+    """A report that already exists for the session is returned, not duplicated."""
+    session_id = await _start(client)
+    await _answer(client, session_id, FREE_ANSWERS)
+    existing = Report(
+        id=uuid.uuid4(), session_id=uuid.UUID(session_id), scores={}, overall_score=0,
+        tier_result="nascent", assessment_version=assessment.version,
+    )
+    db.add(existing)
+    await db.commit()
+    body = await _submit(client, session_id)
+    assert body["report_id"] == str(existing.id)
+    assert (await db.scalar(select(func.count(Report.id)))) == 1
+    session = await db.get(AssessmentSession, uuid.UUID(session_id))
+    assert session.status == SessionStatus.completed
+
+
 async def test_answer_is_idempotent_upsert(client, assessment):
     session_id = await _start(client)
     await _answer(client, session_id, [("s1", "strategy", 1)])
@@ -59,6 +82,145 @@ async def test_answer_is_idempotent_upsert(client, assessment):
     assert answers[0]["answer_value"] == 5
 
 
+def _batch(answers):
+    return [{"question_id": q, "dimension_id": d, "answer_value": v} for q, d, v in answers]
+
+
+async def test_bulk_answers_upsert_in_one_request(client, assessment):
+    session_id = await _start(client)
+    await _answer(client, session_id, [("s1", "strategy", 1)])
+    resp = await client.post(
+        f"/sessions/{session_id}/answers",
+        json=_batch([("s1", "strategy", 4), ("s2", "strategy", 2), ("s2", "strategy", 3)]),
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"ok": True, "saved": 2}
+    answers = (await client.get(f"/sessions/{session_id}/answers")).json()
+    assert {a["question_id"]: a["answer_value"] for a in answers} == {"s1": 4, "s2": 3}
+
+
+async def test_bulk_answers_rejected_after_submit(client, assessment):
+    session_id = await _start(client)
+    await _answer(client, session_id, FREE_ANSWERS)
+    await _submit(client, session_id)
+    resp = await client.post(f"/sessions/{session_id}/answers", json=_batch(FREE_ANSWERS))
+    assert resp.status_code == 409
+
+
+async def test_bulk_answers_batch_size_capped(client, assessment):
+    session_id = await _start(client)
+    too_many = [(f"q{i}", "strategy", 1) for i in range(sessions_router.MAX_ANSWERS_PER_BATCH + 1)]
+    resp = await client.post(f"/sessions/{session_id}/answers", json=_batch(too_many))
+    assert resp.status_code == 422
+
+
+async def test_answer_unknown_session_404(client, assessment):
+    resp = await client.post(f"/sessions/{uuid.uuid4()}/answer", json=_batch(FREE_ANSWERS[:1])[0])
+    assert resp.status_code == 404
+
+
+async def test_answer_other_users_session_403(client, db, assessment):
+    other = User(id=uuid.uuid4(), email="other@example.com", tier=TierEnum.free, role="user")
+    session = AssessmentSession(
+        id=uuid.uuid4(), user_id=other.id, assessment_id=assessment.id,
+        status=SessionStatus.in_progress, tier_at_time=TierEnum.free,
+    )
+    db.add_all([other, session])
+    await db.commit()
+    resp = await client.post(f"/sessions/{session.id}/answers", json=_batch(FREE_ANSWERS))
+    assert resp.status_code == 403
+    assert (await db.scalar(select(func.count(Response.id)))) == 0
+
+
+async def test_transitions_explain_failures(client, db, assessment):
+    """Zero-row conditional updates map to 404 / 403 / 409."""
+    other = User(id=uuid.uuid4(), email="other2@example.com", tier=TierEnum.free, role="user")
+    theirs = AssessmentSession(
+        id=uuid.uuid4(), user_id=other.id, assessment_id=assessment.id,
+        status=SessionStatus.in_progress, tier_at_time=TierEnum.free,
+    )
+    db.add_all([other, theirs])
+    await db.commit()
+
+    assert (await client.post(f"/sessions/{uuid.uuid4()}/submit")).status_code == 404
+    assert (await client.post(f"/sessions/{theirs.id}/submit")).status_code == 403
+    assert (await client.patch(f"/sessions/{theirs.id}/abandon")).status_code == 403
+
+    mine = await _start(client)
+    assert (await client.patch(f"/sessions/{mine}/abandon")).status_code == 200
+    assert (await client.patch(f"/sessions/{mine}/abandon")).status_code == 409
+    assert (await client.post(f"/sessions/{mine}/submit")).status_code == 409
+
+
+async def test_answers_delta_since_cursor(client, db, assessment):
+    session_id = await _start(client)
+    await _answer(client, session_id, FREE_ANSWERS)
+    # Age s1/s2 well past the sync overlap so a cursor can exclude them.
+    old = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    await db.execute(
+        update(Response)
+        .where(Response.session_id == uuid.UUID(session_id), Response.question_id.in_(["s1", "s2"]))
+        .values(answered_at=old)
+    )
+    await db.execute(
+        update(Response)
+        .where(Response.session_id == uuid.UUID(session_id), Response.question_id.in_(["d1", "d2"]))
+        .values(answered_at=old + timedelta(minutes=10))
+    )
+    await db.commit()
+
+    full = await client.get(f"/sessions/{session_id}/answers")
+    assert [a["question_id"] for a in full.json()] == ["s1", "s2", "d1", "d2"]
+    cursor = full.headers["X-Answers-Cursor"]
+
+    resp = await client.get(f"/sessions/{session_id}/answers", params={"since": encode_cursor(
+        (old + timedelta(minutes=1)).isoformat())})
+    assert [a["question_id"] for a in resp.json()] == ["d1", "d2"]
+
+    resp = await client.get(f"/sessions/{session_id}/answers", params={"since": cursor})
+    assert [a["question_id"] for a in resp.json()] == ["d1", "d2"]  # within the overlap
+
+    resp = await client.get(f"/sessions/{session_id}/answers", params={"since": "%%%"})
+    assert resp.status_code == 422
+
+
+async def test_answers_etag_not_modified(client, assessment):
+    session_id = await _start(client)
+    await _answer(client, session_id, FREE_ANSWERS[:2])
+
+    first = await client.get(f"/sessions/{session_id}/answers")
+    etag = first.headers["ETag"]
+    resp = await client.get(f"/sessions/{session_id}/answers", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["ETag"] == etag
+
+    await _answer(client, session_id, [("s1", "strategy", 1)])
+    resp = await client.get(f"/sessions/{session_id}/answers", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+
+async def test_bootstrap_returns_assessment_answers_and_progress(client, db, assessment, user):
+    session_id = await _start(client)
+    await _answer(client, session_id, FREE_ANSWERS[:3])
+    # Upgrading doesn't change what an already-started session sees.
+    user.tier = TierEnum.premium
+    await db.commit()
+
+    resp = await client.get(f"/sessions/{session_id}/bootstrap")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["session"]["id"] == session_id
+    assert body["session"]["assessment_slug"] == "test-assessment"
+    assert [q["id"] for d in body["assessment"]["dimensions"] for q in d["questions"]] == ["s1", "s2", "d1", "d2"]
+    assert {a["question_id"] for a in body["answers"]} == {"s1", "s2", "d1"}
+    assert (body["answered"], body["total"], body["progress_pct"]) == (3, 4, 75)
+    assert "X-Answers-Cursor" in resp.headers
+
+    assert (await client.get(f"/sessions/{uuid.uuid4()}/bootstrap")).status_code == 404
+
+
 # ── GET /sessions enrichment ─────────────────────────────────────────────────
 
 async def test_list_sessions_in_progress_has_progress_pct(client, assessment):
@@ -103,6 +265,76 @@ async def test_list_sessions_progress_capped_at_100(client, assessment):
     assert s["progress_pct"] == 100
 
 
+async def test_session_counters_track_distinct_answers(client, db, assessment):
+    session_id = await _start(client)
+    session = await db.get(AssessmentSession, uuid.UUID(session_id))
+    assert (session.answered_count, session.total_questions) == (0, 4)  # free tier
+
+    await _answer(client, session_id, FREE_ANSWERS[:2])
+    await _answer(client, session_id, [("s1", "strategy", 1)])  # overwrite, not a new answer
+    resp = await client.post(
+        f"/sessions/{session_id}/answers", json=_batch([("s2", "strategy", 2), ("d1", "data", 3)])
+    )
+    assert resp.json()["saved"] == 2
+
+    await db.refresh(session)
+    assert session.answered_count == 3
+    [s] = (await client.get("/sessions")).json()
+    assert s["progress_pct"] == 75
+
+
+async def test_list_sessions_pages_by_cursor(client, db, assessment, user):
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # Two pairs share a started_at, so the id has to break the tie.
+    started = [base, base, base + timedelta(hours=1), base + timedelta(hours=1), base + timedelta(hours=2)]
+    db.add_all(
+        AssessmentSession(id=uuid.uuid4(), user_id=user.id, assessment_id=assessment.id,
+                          status=SessionStatus.abandoned, tier_at_time=TierEnum.free, started_at=t)
+        for t in started
+    )
+    await db.commit()
+
+    seen, cursor = [], None
+    while True:
+        resp = await client.get("/sessions", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert resp.status_code == 200
+        page = resp.json()
+        seen += page
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        assert len(page) == 2
+
+    assert len(seen) == 5
+    assert len({s["id"] for s in seen}) == 5
+    keys = [(s["started_at"], s["id"]) for s in seen]
+    assert keys == sorted(keys, reverse=True)
+
+    resp = await client.get("/sessions", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 422
+
+
+async def test_report_payload_fixed_at_submit(client, db, assessment, config):
+    session_id = await _start(client)
+    await _answer(client, session_id, FREE_ANSWERS)
+    await _submit(client, session_id)
+    before = (await client.get(f"/reports/{session_id}")).json()
+
+    renamed = copy.deepcopy(config)
+    renamed["dimensions"][0]["name"] = "Strategy"
+    renamed["scoring"]["recommendations"]["strategy"]["maturing"] = "rewritten"
+    assessment.config = renamed
+    assessment.version = 2
+    await db.commit()
+
+    # Relabelling or rewriting the assessment doesn't touch issued reports.
+    [s] = (await client.get("/sessions")).json()
+    assert {p["label"] for p in s["dimension_scores"]} == {"Strategy & Vision", "Data & Infrastructure"}
+    assert (await client.get(f"/reports/{session_id}")).json() == before
+    report = await db.scalar(select(Report).where(Report.session_id == uuid.UUID(session_id)))
+    assert report.assessment_version == 1
+
+
 async def test_background_pdf_sets_pdf_url(client, assessment, mock_pdf):
     session_id = await _start(client)
     await _answer(client, session_id, FREE_ANSWERS)
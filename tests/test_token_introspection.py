@@ -0,0 +1,126 @@
+"""Unit tests for the async Supabase token introspection client."""
+import asyncio
+import uuid
+
+import httpx
+import pytest
+
+import app.services.token_introspection as token_introspection
+from app.services.token_introspection import IntrospectionUnavailable, TokenIntrospector
+from app.services.token_verifier import TokenRejected
+
+USER_ID = uuid.uuid4()
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch):
+    monkeypatch.setattr(token_introspection.settings, "SUPABASE_URL", "https://project.supabase.test")
+    monkeypatch.setattr(token_introspection.settings, "SUPABASE_SERVICE_ROLE_KEY", "service-role")
+
+
+def _introspector(handler, max_concurrency: int = 10) -> TokenIntrospector:
+    intro = TokenIntrospector(max_concurrency=max_concurrency, negative_ttl_seconds=60, timeout_seconds=1)
+    intro._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return intro
+
+
+def _ok(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"id": str(USER_ID), "email": "user@example.com"})
+
+
+async def test_valid_token_returns_identity():
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return _ok(request)
+
+    identity = await _introspector(handler).introspect("tok")
+    assert identity.user_id == USER_ID
+    assert seen[0].url.path == "/auth/v1/user"
+    assert seen[0].headers["authorization"] == "Bearer tok"
+    assert seen[0].headers["apikey"] == "service-role"
+
+
+async def test_concurrent_checks_of_same_token_share_one_call():
+    calls = 0
+
+    async def handler(request):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return _ok(request)
+
+    intro = _introspector(handler)
+    results = await asyncio.gather(*(intro.introspect("same-token") for _ in range(6)))
+    assert calls == 1
+    assert intro.coalesced == 5
+    assert {r.user_id for r in results} == {USER_ID}
+
+
+async def test_rejection_is_cached_briefly():
+    calls = 0
+
+    def handler(request):
+        nonlocal calls
+        calls += 1
+        return httpx.Response(401, json={"msg": "invalid JWT"})
+
+    intro = _introspector(handler)
+    for _ in range(3):
+        with pytest.raises(TokenRejected):
+            await intro.introspect("revoked")
+    assert calls == 1
+
+
+async def test_transient_failure_is_not_cached():
+    calls = 0
+
+    def handler(request):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise httpx.ConnectError("boom")
+        return _ok(request)
+
+    intro = _introspector(handler)
+    with pytest.raises(IntrospectionUnavailable):
+        await intro.introspect("tok")
+    assert (await intro.introspect("tok")).user_id == USER_ID
+
+
+@pytest.mark.parametrize("code", [500, 503, 429])
+async def test_supabase_outage_is_not_a_rejection(code):
+    calls = 0
+
+    def handler(request):
+        nonlocal calls
+        calls += 1
+        return httpx.Response(code) if calls == 1 else _ok(request)
+
+    intro = _introspector(handler)
+    with pytest.raises(IntrospectionUnavailable):
+        await intro.introspect("tok")
+    assert (await intro.introspect("tok")).user_id == USER_ID
+
+
+async def test_concurrency_is_capped():
+    active = peak = 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return _ok(request)
+
+    intro = _introspector(handler, max_concurrency=2)
+    await asyncio.gather(*(intro.introspect(f"tok-{i}") for i in range(6)))
+    assert peak == 2
+
+
+async def test_missing_config_raises_runtime_error(monkeypatch):
+    monkeypatch.setattr(token_introspection.settings, "SUPABASE_SERVICE_ROLE_KEY", "")
+    with pytest.raises(RuntimeError):
+        await _introspector(_ok).introspect("tok")
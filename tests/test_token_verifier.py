@@ -0,0 +1,161 @@
+"""Unit tests for local JWT verification in app/services/token_verifier.py."""
+import asyncio
+import time
+import uuid
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import app.services.token_verifier as token_verifier
+from app.services.token_verifier import CannotVerifyLocally, JWKSCache, TokenRejected
+
+SECRET = "super-secret-jwt-key-for-tests-only"
+SUPABASE_URL = "https://project.supabase.test"
+USER_ID = uuid.uuid4()
+
+
+def _claims(**overrides) -> dict:
+    claims = {
+        "sub": str(USER_ID),
+        "email": "user@example.com",
+        "aud": "authenticated",
+        "iss": f"{SUPABASE_URL}/auth/v1",
+        "exp": int(time.time()) + 3600,
+    }
+    claims.update(overrides)
+    return {k: v for k, v in claims.items() if v is not None}
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch):
+    monkeypatch.setattr(token_verifier.settings, "AUTH_VERIFY_MODE", "local")
+    monkeypatch.setattr(token_verifier.settings, "SUPABASE_JWT_SECRET", SECRET)
+    monkeypatch.setattr(token_verifier.settings, "SUPABASE_URL", SUPABASE_URL)
+    monkeypatch.setattr(token_verifier, "_jwks", None)
+
+
+# ── HS256 (project JWT secret) ───────────────────────────────────────────────
+
+async def test_valid_hs256_token():
+    identity = await token_verifier.verify_locally(jwt.encode(_claims(), SECRET, algorithm="HS256"))
+    assert identity.user_id == USER_ID
+    assert identity.email == "user@example.com"
+
+
+@pytest.mark.parametrize("overrides", [
+    {"exp": int(time.time()) - 3600},       # expired
+    {"aud": "anon"},                        # wrong audience
+    {"iss": "https://evil.test/auth/v1"},   # wrong issuer
+    {"email": None},                        # no email claim
+    {"sub": "not-a-uuid"},
+    {"exp": None},                          # exp is required
+])
+async def test_bad_claims_rejected(overrides):
+    token = jwt.encode(_claims(**overrides), SECRET, algorithm="HS256")
+    with pytest.raises(TokenRejected):
+        await token_verifier.verify_locally(token)
+
+
+async def test_wrong_signature_rejected():
+    token = jwt.encode(_claims(), "some-other-secret-of-enough-length", algorithm="HS256")
+    with pytest.raises(TokenRejected):
+        await token_verifier.verify_locally(token)
+
+
+async def test_malformed_token_rejected():
+    with pytest.raises(TokenRejected):
+        await token_verifier.verify_locally("not-a-jwt")
+
+
+# ── fallback signals ─────────────────────────────────────────────────────────
+
+async def test_no_key_material_cannot_verify(monkeypatch):
+    monkeypatch.setattr(token_verifier.settings, "SUPABASE_JWT_SECRET", "")
+    monkeypatch.setattr(token_verifier.settings, "SUPABASE_URL", "")
+    with pytest.raises(CannotVerifyLocally):
+        await token_verifier.verify_locally(jwt.encode(_claims(), SECRET, algorithm="HS256"))
+
+
+async def test_remote_mode_cannot_verify(monkeypatch):
+    monkeypatch.setattr(token_verifier.settings, "AUTH_VERIFY_MODE", "remote")
+    with pytest.raises(CannotVerifyLocally):
+        await token_verifier.verify_locally(jwt.encode(_claims(), SECRET, algorithm="HS256"))
+
+
+# ── RS256 (JWKS) ─────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def rsa_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _jwks_with(private_key, kid: str) -> JWKSCache:
+    public_jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    public_jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    cache = JWKSCache("https://jwks.test", ttl_seconds=600)
+    cache._keys = {kid: jwt.PyJWK(public_jwk)}
+    cache._fetched_at = time.monotonic()
+    return cache
+
+
+async def test_valid_rs256_token_from_jwks(monkeypatch, rsa_key):
+    monkeypatch.setattr(token_verifier, "_jwks", _jwks_with(rsa_key, "key-1"))
+    token = jwt.encode(_claims(), rsa_key, algorithm="RS256", headers={"kid": "key-1"})
+    identity = await token_verifier.verify_locally(token)
+    assert identity.user_id == USER_ID
+
+
+async def test_unknown_kid_cannot_verify(monkeypatch, rsa_key):
+    monkeypatch.setattr(token_verifier, "_jwks", _jwks_with(rsa_key, "key-1"))
+    token = jwt.encode(_claims(), rsa_key, algorithm="RS256", headers={"kid": "rotated"})
+    with pytest.raises(CannotVerifyLocally):
+        await token_verifier.verify_locally(token)
+
+
+async def test_stale_jwks_served_while_refreshing(monkeypatch, rsa_key):
+    cache = _jwks_with(rsa_key, "key-1")
+    cache._fetched_at = time.monotonic() - 10_000
+    refreshed = []
+
+    async def fake_refresh():
+        refreshed.append(True)
+
+    monkeypatch.setattr(cache, "refresh", fake_refresh)
+    assert await cache.get_key("key-1") is not None
+    await cache._refresh_task
+    assert refreshed == [True]
+
+
+async def test_concurrent_cold_lookups_fetch_once(monkeypatch, rsa_key):
+    public_jwk = jwt.algorithms.RSAAlgorithm.to_jwk(rsa_key.public_key(), as_dict=True)
+    public_jwk.update({"kid": "key-1", "alg": "RS256", "use": "sig"})
+    fetches = []
+
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"keys": [public_jwk]}
+
+    class FakeClient:
+        def __init__(self, **kwargs):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def get(self, url):
+            fetches.append(url)
+            await asyncio.sleep(0.01)
+            return FakeResponse()
+
+    monkeypatch.setattr(token_verifier.httpx, "AsyncClient", FakeClient)
+    cache = JWKSCache("https://jwks.test", ttl_seconds=600)
+    keys = await asyncio.gather(*(cache.get_key("key-1") for _ in range(10)))
+    assert all(key is not None for key in keys)
+    assert len(fetches) == 1